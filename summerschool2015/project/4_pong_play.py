@@ -2,11 +2,23 @@ import nest
 import nest.raster_plot as rplt
 import numpy as np
 import matplotlib.pyplot as plt
-import pong_environment_play as env
 from mpl_toolkits.mplot3d import Axes3D
 import os
-import json
 import time
+# PONG_LOCKSTEP=1 advances a headless game by a fixed number of frames per
+# simulation slice instead of letting it run on its own clock
+LOCKSTEP = os.environ.get('PONG_LOCKSTEP') == '1'
+if LOCKSTEP:
+    import pong_environment_lockstep as env
+else:
+    import pong_environment_play as env
+from spike_readout import SpikeCountReadout
+from spike_store import SpikeStore
+from network_checkpoint import RestoreNetworkFromFile
+from realtime import RealTimePacer
+import latency_probe
+from connection_index import ConnectionIndex
+from state_encoder import StateEncoder
 
 def plot(fig, ax, events):
     plt.cla()
@@ -17,22 +29,6 @@ def plot(fig, ax, events):
     plt.scatter(events['times'][-l:], events['senders'][-l:])
     plt.draw()
 
-def SaveNetworkToFile(filename, source, target):
-	if os.path.exists(filename):
-		os.remove(filename)
-	status = nest.GetStatus(nest.GetConnections(source, target))
-	status = [{'source': i['source'], 'target': i['target'], 'weight': i['weight'], 'delay': i['delay'], 'synapse_model': "static_synapse"} for i in status] 
-	f = open(filename, 'w+')
-	f.write(json.dumps(status))
-	f.close()
-
-def RestoreNetworkFromFile(filename):
-	if os.path.exists(filename):
-		f = open(filename, 'r+')
-		status = json.loads(f.read())
-		f.close()
-		nest.DataConnect(status)
-
 #env.set_environment(9)
 
 NUM_ITERATIONS = 20
@@ -46,7 +42,10 @@ nest.set_verbosity("M_FATAL")
 
 rank = nest.Rank()
 size = nest.NumProcesses() 
-seed = np.random.randint(0, 1000000)
+if 'PONG_SEED' in os.environ:
+    seed = int(os.environ['PONG_SEED'])
+else:
+    seed = np.random.randint(0, 1000000)
 num_threads = 4
 nest.SetKernelStatus({"local_num_threads": num_threads})
 nest.SetKernelStatus({"rng_seeds": range(seed+num_threads * size + 1, seed + 2 * (num_threads * size) + 1),
@@ -102,8 +101,14 @@ nest.Connect(wta_inh_neurons, sd_wta)
 sd_actions = nest.Create('spike_detector', num_actions)
 for i in range(len(actions)):
     nest.Connect(actions[i], [sd_actions[i]])
+action_readout = SpikeCountReadout(sd_actions)
 sd_states = nest.Create('spike_detector')
 nest.Connect(all_states, sd_states)
+# the detectors are drained every few decisions so they do not grow over
+# long sessions, PONG_SPIKE_STORE=<prefix> keeps all spikes on disk
+SPIKE_STORE = os.environ.get('PONG_SPIKE_STORE')
+wta_store = SpikeStore(sd_wta, filename=SPIKE_STORE and SPIKE_STORE + "_wta")
+states_store = SpikeStore(sd_states, filename=SPIKE_STORE and SPIKE_STORE + "_states")
 
 
 
@@ -116,6 +121,9 @@ for i in range(world_dim['x']):
         
 # Connect states to actions with initial weight 0.0
 RestoreNetworkFromFile("connections.dat")
+conn_index = ConnectionIndex(stimulus, states, actions)
+# switches the stimulus between states, a repeated state costs nothing
+state_encoder = StateEncoder(conn_index)
 
 
 gamma = 0.8
@@ -143,49 +151,60 @@ in_end_position = False
 #fig, ax = plt.subplots()
 #plt.ion()
 
+# paces the simulation slices to wall-clock time
+pacer = RealTimePacer()
 while actions_executed < NUM_ITERATIONS:
     if not in_end_position:
         # stimulate new state
-        nest.SetStatus(nest.GetConnections(stimulus, states[position['x']][position['y']]), {'weight': 0.})
+        decision_start = time.time()
         position = env.getState().copy()
-        nest.SetStatus(nest.GetConnections(stimulus, states[position['x']][position['y']]), {'weight': 1.})
+        state_encoder.encode(position)
         
         nest.SetStatus(wta_noise, {'rate': 3000.})
         for t in range(8):
-            nest.Simulate(5)
-            time.sleep(0.01)
+            with latency_probe.probe('simulate'):
+                nest.Simulate(5)
+            if LOCKSTEP:
+                env.step()
+            else:
+                pacer.wait(5)
 
-        #plot(fig, ax, nest.GetStatus(sd_wta, keys='events')[0])
+        #plot(fig, ax, wta_store.recent())
 
-        max_rate = -1
-        chosen_action = -1
-        for i in range(len(sd_actions)):
-            rate = len([e for e in nest.GetStatus([sd_actions[i]], keys='events')[0]['times'] if e > last_action_time]) # calc the "firerate" of each actor population
-            if rate > max_rate:
-                max_rate = rate # the population with the hightes rate wins
-                chosen_action = i
+        # the population with the highest rate wins
+        with latency_probe.probe('readout'):
+            chosen_action, max_rate = action_readout.winner()
 
         nest.SetStatus(stimulus, {'rate': 5000.})
 
         possible_actions = env.get_possible_actions() 
 
         new_position, outcome, in_end_position = env.move(possible_actions[chosen_action])
+        # from reading the state to handing the action to the game
+        latency_probe.record('decision', time.time() - decision_start)
 
         nest.SetStatus(wta_noise, {'rate': 0.})
         for t in range(4):
-            nest.Simulate(5)
-            time.sleep(0.01)
+            with latency_probe.probe('simulate'):
+                nest.Simulate(5)
+            if LOCKSTEP:
+                env.step()
+            else:
+                pacer.wait(5)
         
               
         last_action_time += 60
+        action_readout.clear()
         actions_executed += 1
+        wta_store.update(actions_executed)
+        states_store.update(actions_executed)
     else:
         position = env.get_agent_pos().copy()        
         _, in_end_position = env.init_new_trial()
-        nest.SetStatus(nest.GetConnections(stimulus, states[position['x']][position['y']]), {'weight': 0.})
+        state_encoder.clear()
 
-rplt.from_device(sd_wta, title="WTA circuit")
-rplt.from_device(sd_states, title="states")
+rplt.from_data(wta_store.recent_data(), title="WTA circuit")
+rplt.from_data(states_store.recent_data(), title="states")
 rplt.show()
        
 #fig = plt.figure()
@@ -4,25 +4,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pong_environment_play_continious as env
 import os
-import json
-import time
-
-def SaveNetworkToFile(filename, source, target):
-    if os.path.exists(filename):
-        os.remove(filename)
-    status = nest.GetStatus(nest.GetConnections(source, target))
-    status = [{'source': i['source'], 'target': i['target'], 'weight': i['weight'], 'delay': i['delay'], 'synapse_model': "static_synapse"} for i in status]
-    f = open(filename, 'w+')
-    f.write(json.dumps(status))
-    f.close()
-
-def RestoreNetworkFromFile(filename):
-    if os.path.exists(filename):
-        f = open(filename, 'r+')
-        status = json.loads(f.read())
-        f.close()
-        nest.DataConnect(status)
-
+from spike_readout import SpikeCountReadout
+from spike_store import SpikeStore
+from sensor_encoding import triangle_left, triangle_right, difference_rates
+from state_encoder import RateEncoder
+from network_checkpoint import RestoreNetworkFromFile
+from realtime import RealTimePacer
 
 NUM_ITERATIONS = 200
 LEARNING_RATE = 0.005
@@ -47,29 +34,26 @@ diff_K = 100.  # specify K between diff and generator rate
 diff_K2 = 20000.
 sensors = {'left': nest.Create('poisson_generator')[0], 'right': nest.Create('poisson_generator')[0]}
 
-# Create diff neurons
+# Create diff neurons, one every density pixels
 density = 3 # pixels for one neuron
-diffNeuronsPositions = []
-diffNeurons = []
-for i in range(env.params['screenSize']):
-    if(i % density == 0):
-        neuron = nest.Create('iaf_psc_alpha')[0]
-        diffNeurons.append(neuron)
-        diffNeuronsPositions.append({'position': i, 'neuron': neuron})
+diffNeuronsPositions = np.arange(0, env.params['screenSize'], density)
+diffNeurons = list(nest.Create('iaf_psc_alpha', len(diffNeuronsPositions)))
 
 # connect left-right
 m = 20.
 length = env.params['screenSize']
 p1 = length / 2
-k1 = m/p1
-for i in range(len(diffNeuronsPositions)):
-    neuronPosition = diffNeuronsPositions[i]
-    x = neuronPosition['position']
-    #connect neuron to the difference sensor depends on it position
-    if(x >= 0 and x <= p1):
-        nest.Connect(sensors['left'], neuronPosition['neuron'], {"weight": x * k1})
-    if(x >= p1 and x <= length):
-        nest.Connect(sensors['right'], neuronPosition['neuron'], {"weight": -(x * k1) + m*2})
+# connect neurons to the difference sensors depending on their position,
+# the weights rise towards the middle of the screen
+x = diffNeuronsPositions
+left = (x >= 0) & (x <= p1)
+right = (x >= p1) & (x <= length)
+neurons = np.array(diffNeurons)
+# all_to_all takes one weight per (target, source) pair
+nest.Connect([sensors['left']], neurons[left].tolist(), 'all_to_all',
+             {'weight': triangle_left(x[left], length, m).reshape(-1, 1)})
+nest.Connect([sensors['right']], neurons[right].tolist(), 'all_to_all',
+             {'weight': triangle_right(x[right], length, m).reshape(-1, 1)})
 
 #create actions
 numActions = len(env.actionsAvailable)
@@ -80,14 +64,22 @@ all_actions = np.ravel(actions).tolist()
 
 # create noise
 noise = nest.Create('poisson_generator', 10, {'rate': 3000.})
+# rates of the sensors and the noise, only changed rates are sent
+rate_encoder = RateEncoder([sensors['left'], sensors['right']] + list(noise))
 
 sd_all = nest.Create('spike_detector')
 nest.Connect(diffNeurons, sd_all)
 sd_actions = nest.Create('spike_detector', numActions)
 for i in range(numActions):
     nest.Connect(actions[i], [sd_actions[i]], 'all_to_all')
+action_readout = SpikeCountReadout(sd_actions)
 sd_all_actions = nest.Create('spike_detector')
 nest.Connect(all_actions, sd_all_actions, 'all_to_all')
+# the detectors are drained every few decisions so they do not grow over
+# long sessions, PONG_SPIKE_STORE=<prefix> keeps all spikes on disk
+SPIKE_STORE = os.environ.get('PONG_SPIKE_STORE')
+diff_store = SpikeStore(sd_all, filename=SPIKE_STORE and SPIKE_STORE + "_diff")
+actions_store = SpikeStore(sd_all_actions, filename=SPIKE_STORE and SPIKE_STORE + "_actions")
 
 RestoreNetworkFromFile("connections.dat")
 
@@ -97,51 +89,45 @@ position = env.getState().copy()
 in_end_position = False
 NUM_ITERATIONS = 20000
 
+# paces the simulation slices to wall-clock time, 4 ms slices with 10 ms
+# sleeps ran at 0.4 before
+pacer = RealTimePacer(float(os.environ.get('PONG_REALTIME_RATIO', 0.4)))
 while actions_executed < NUM_ITERATIONS:
     if not in_end_position:
         state = env.getState().copy()
         print 'difference: ', state['diff']
         input
-        if(state['diff'] >= 0):
-            nest.SetStatus([sensors['right']], {'rate':diff_K*state['diff']})
-        else:
-            nest.SetStatus([sensors['left']], {'rate':-diff_K*state['diff']})
-        nest.SetStatus(noise, {'rate': 3000. })
+        left_rate, right_rate = difference_rates(state['diff'], diff_K)
+        rate_encoder.set_rates([left_rate, right_rate] + [3000.] * len(noise))
 
         for t in range(10):
             nest.Simulate(4)
-            time.sleep(0.01)
-
-        max_rate = -1
-        chosen_action = -1
-        for i in range(len(sd_actions)):
-            rate = len([e for e in nest.GetStatus([sd_actions[i]], keys='events')[0]['times'] if e > last_action_time]) # calc the "firerate" of each actor population
-            if rate > max_rate:
-                max_rate = rate # the population with the hightes rate wins
-                chosen_action = i
+            pacer.wait(4)
+
+        # the population with the highest rate wins
+        chosen_action, max_rate = action_readout.winner()
         possible_actions = env.actionsAvailable
         FIRE_RATE_K = 0.5
         new_position, outcome, in_end_position = env.move(possible_actions[chosen_action], max_rate*FIRE_RATE_K)
 
-        nest.SetStatus([sensors['right']], {'rate':0.})
-        nest.SetStatus([sensors['left']], {'rate':0.})
-        nest.SetStatus(noise, {'rate': 0. })
+        rate_encoder.set_rates(0.)
 
         for t in range(5):
             nest.Simulate(4)
-            time.sleep(0.01)
+            pacer.wait(4)
 
         last_action_time += 60
+        action_readout.clear()
         actions_executed += 1
+        diff_store.update(actions_executed)
+        actions_store.update(actions_executed)
     else:
         state = env.getState().copy()
-        nest.SetStatus([sensors['right']], {'rate':0.})
-        nest.SetStatus([sensors['left']], {'rate':0.})
-        nest.SetStatus(noise, {'rate': 0. })
+        rate_encoder.set_rates(0.)
         _, in_end_position = env.init_new_trial()
 
 
-rplt.from_device(sd_all_actions, title="Actions")
-rplt.from_device(sd_all, title="Difference neurons")
+rplt.from_data(actions_store.recent_data(), title="Actions")
+rplt.from_data(diff_store.recent_data(), title="Difference neurons")
 rplt.show()
 
@@ -5,24 +5,10 @@ import matplotlib.pyplot as plt
 import pong_environment_training as env
 from mpl_toolkits.mplot3d import Axes3D
 import os
-import json
-
-def SaveNetworkToFile(filename, source, target):
-	if os.path.exists(filename):
-		os.remove(filename)
-	status = nest.GetStatus(nest.GetConnections(source, target))
-	status = [{'source': i['source'], 'target': i['target'], 'weight': i['weight'], 'delay': i['delay'], 'synapse_model': "static_synapse"} for i in status] 
-	f = open(filename, 'w+')
-	f.write(json.dumps(status))
-	f.close()
-
-def RestoreNetworkFromFile(filename):
-	if os.path.exists(filename):
-		f = open(filename, 'r+')
-		status = json.loads(f.read())
-		f.close()
-		nest.DataConnect(status)
-
+from spike_readout import SpikeCountReadout
+from network_checkpoint import SaveNetworkToFile
+from connection_index import ConnectionIndex, WeightBatch
+from state_encoder import StateEncoder
 
 NUM_ITERATIONS = 500
 LEARNING_RATE = 0.5
@@ -30,13 +16,23 @@ NUM_STATE_NEURONS = 20
 NUM_WTA_NEURONS = 50
 WEIGHT_SCALING = 100 / NUM_STATE_NEURONS
 
+# set by training_farm.py to run many trainings side by side
+OUTPUT_DIR = os.environ.get('PONG_OUTPUT_DIR', '.')
+SHOW_PLOTS = os.environ.get('PONG_NO_PLOT') != '1'
+
 nest.ResetKernel()
 nest.set_verbosity("M_FATAL")
 
 rank = nest.Rank()
 size = nest.NumProcesses() 
-seed = np.random.randint(0, 1000000)
-num_threads = 4
+if 'PONG_SEED' in os.environ:
+    seed = int(os.environ['PONG_SEED'])
+else:
+    seed = np.random.randint(0, 1000000)
+# the environment places the ball with numpy.random, seeding it makes a
+# run reproducible from its seed
+np.random.seed(seed)
+num_threads = int(os.environ.get('PONG_THREADS', 4))
 nest.SetKernelStatus({"local_num_threads": num_threads})
 nest.SetKernelStatus({"rng_seeds": range(seed+num_threads * size + 1, seed + 2 * (num_threads * size) + 1),
         		      "grng_seed": seed+size+num_threads,
@@ -92,6 +88,7 @@ nest.Connect(wta_inh_neurons, sd_wta)
 sd_actions = nest.Create('spike_detector', num_actions)
 for i in range(len(actions)):
     nest.Connect(actions[i], [sd_actions[i]])
+action_readout = SpikeCountReadout(sd_actions)
 sd_states = nest.Create('spike_detector')
 nest.Connect(all_states, sd_states)
 
@@ -106,6 +103,9 @@ for i in range(world_dim['x']):
         
 # Connect states to actions with initial weight 0.0
 nest.Connect(all_states, all_actions, 'all_to_all', {'weight': 0.0})
+conn_index = ConnectionIndex(stimulus, states, actions)
+# switches the stimulus between states, a repeated state costs nothing
+state_encoder = StateEncoder(conn_index)
 
 gamma = 0.8
 
@@ -121,6 +121,7 @@ def update_values(position, chosen_action, new_position, outcome):
 
 
 # Main loop
+rewards = np.zeros(NUM_ITERATIONS)
 actions_executed = 0
 last_action_time = 0
 in_end_position = False
@@ -128,17 +129,12 @@ in_end_position = False
 while actions_executed < NUM_ITERATIONS:
     if not in_end_position:
         position = env.get_agent_pos().copy()
-        nest.SetStatus(nest.GetConnections(stimulus, states[position['x']][position['y']]), {'weight': 1.})
+        state_encoder.encode(position)
         
         nest.SetStatus(wta_noise, {'rate': 3000.})
         nest.Simulate(100)
-        max_rate = -1
-        chosen_action = -1
-        for i in range(len(sd_actions)):
-            rate = len([e for e in nest.GetStatus([sd_actions[i]], keys='events')[0]['times'] if e > last_action_time]) # calc the "firerate" of each actor population
-            if rate > max_rate:
-                max_rate = rate # the population with the hightes rate wins
-                chosen_action = i
+        # the population with the highest rate wins
+        chosen_action, max_rate = action_readout.winner()
         nest.SetStatus(stimulus, {'rate': 5000.})
 
         possible_actions = env.get_possible_actions() 
@@ -146,31 +142,36 @@ while actions_executed < NUM_ITERATIONS:
         new_position, outcome, in_end_position = env.move(possible_actions[chosen_action])
 
         prediction_error = update_values(position, chosen_action, new_position, outcome)
+        rewards[actions_executed] = outcome
 
         print "iteration:", actions_executed, "action:", chosen_action, 
         print "new pos:", new_position, "reward:", outcome, "updated values:", values[position['x']][position['y']], "prediction error:", prediction_error
 
-        for i in range(num_actions):
-            nest.SetStatus(nest.GetConnections(states[position['x']][position['y']], actions[i]), {'weight': values[position['x']][position['y']][i] * WEIGHT_SCALING})
+        # new weights and stimulus switch go to the kernel in one call
+        weight_batch = WeightBatch()
+        conn_index.set_action_weights(position, values[position['x']][position['y']] * WEIGHT_SCALING, weight_batch)
             
         # stimulate new state
-        nest.SetStatus(nest.GetConnections(stimulus, states[position['x']][position['y']]), {'weight': 0.})
-        nest.SetStatus(nest.GetConnections(stimulus, states[new_position['x']][new_position['y']]), {'weight': 1.})
+        state_encoder.encode(new_position, weight_batch)
+        weight_batch.flush()
 
         nest.SetStatus(wta_noise, {'rate': 0.})
         nest.Simulate(50.)
               
         last_action_time += 150
+        action_readout.clear()
         actions_executed += 1
     else:
         position = env.get_agent_pos().copy()        
         _, in_end_position = env.init_new_trial()
-        nest.SetStatus(nest.GetConnections(stimulus, states[position['x']][position['y']]), {'weight': 0.})
-
-SaveNetworkToFile("connections.dat", all_states, all_actions)
-rplt.from_device(sd_wta, title="WTA circuit")
-rplt.from_device(sd_states, title="states")
-rplt.show()
+        state_encoder.clear()
+
+SaveNetworkToFile(os.path.join(OUTPUT_DIR, "connections.dat"), all_states, all_actions)
+np.save(os.path.join(OUTPUT_DIR, "rewards.npy"), rewards)
+if SHOW_PLOTS:
+    rplt.from_device(sd_wta, title="WTA circuit")
+    rplt.from_device(sd_states, title="states")
+    rplt.show()
        
 #fig = plt.figure()
 
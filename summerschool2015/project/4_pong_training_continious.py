@@ -14,18 +14,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pong_environment_training_continious as env
 from mpl_toolkits.mplot3d import Axes3D
-import os
-import json
 import math
-
-def SaveNetworkToFile(filename, source, target):
-    if os.path.exists(filename):
-        os.remove(filename)
-    status = nest.GetStatus(nest.GetConnections(source, target))
-    status = [{'source': i['source'], 'target': i['target'], 'weight': i['weight'], 'delay': i['delay'], 'synapse_model': "static_synapse"} for i in status]
-    f = open(filename, 'w+')
-    f.write(json.dumps(status))
-    f.close()
+from spike_readout import SpikeCountReadout
+from sensor_encoding import triangle_left, triangle_right, difference_rates
+from state_encoder import RateEncoder
+from network_checkpoint import SaveNetworkToFile
 
 NUM_ITERATIONS = 300
 LEARNING_RATE = 0.005
@@ -51,29 +44,26 @@ diff_K = 100. # specify K between diff and generator rate
 diff_K2 = 20000.
 sensors = {'left':nest.Create('poisson_generator')[0], 'right':nest.Create('poisson_generator')[0]}
 
-# Create diff neurons
+# Create diff neurons, one every density pixels
 density = 3 # pixels for one neuron
-diffNeuronsPositions = []
-diffNeurons = []
-for i in range(env.params['screenSize']):
-    if(i % density == 0):
-        neuron = nest.Create('iaf_psc_alpha')[0]
-        diffNeurons.append(neuron)
-        diffNeuronsPositions.append({'position':i, 'neuron':neuron})
+diffNeuronsPositions = np.arange(0, env.params['screenSize'], density)
+diffNeurons = list(nest.Create('iaf_psc_alpha', len(diffNeuronsPositions)))
 
 # connect left-right
 m = 20.
 length = env.params['screenSize']
 p1 = length / 2
-k1 = m/p1
-for i in range(len(diffNeuronsPositions)):
-    neuronPosition = diffNeuronsPositions[i]
-    x = neuronPosition['position']
-    # connect neuron to the difference sensor depends on it position
-    if(x >= 0 and x <= p1):
-        nest.Connect(sensors['left'], neuronPosition['neuron'], {"weight": x*k1})
-    if(x >= p1 and x <= length):
-        nest.Connect(sensors['right'], neuronPosition['neuron'], {"weight": -(x * k1) + m*2})
+# connect neurons to the difference sensors depending on their position,
+# the weights rise towards the middle of the screen
+x = diffNeuronsPositions
+left = (x >= 0) & (x <= p1)
+right = (x >= p1) & (x <= length)
+neurons = np.array(diffNeurons)
+# all_to_all takes one weight per (target, source) pair
+nest.Connect([sensors['left']], neurons[left].tolist(), 'all_to_all',
+             {'weight': triangle_left(x[left], length, m).reshape(-1, 1)})
+nest.Connect([sensors['right']], neurons[right].tolist(), 'all_to_all',
+             {'weight': triangle_right(x[right], length, m).reshape(-1, 1)})
 
 # create actions
 numActions = len(env.actionsAvailable)
@@ -87,6 +77,8 @@ nest.Connect(diffNeurons, actions[2], 'all_to_all', {'weight': 0.1})
 
 # create noise
 noise = nest.Create('poisson_generator', 10, {'rate': 3000.})
+# rates of the sensors and the noise, only changed rates are sent
+rate_encoder = RateEncoder([sensors['left'], sensors['right']] + list(noise))
 nest.Connect(noise, actions[0], 'all_to_all', {'weight': noise_weights})
 nest.Connect(noise, actions[2], 'all_to_all', {'weight': noise_weights})
 nest.Connect(noise, actions[1], 'all_to_all', {'weight': 1.1*noise_weights})
@@ -94,10 +86,15 @@ all_signals = diffNeurons + list(noise)
 
 sd_all = nest.Create('spike_detector')
 nest.Connect(diffNeurons, sd_all)
+# difference neuron spikes of the current action step only
+sd_window = nest.Create('spike_detector')
+nest.Connect(diffNeurons, sd_window)
+window_readout = SpikeCountReadout(sd_window)
 
 sd_actions = nest.Create('spike_detector', numActions)
 for i in range(numActions):
     nest.Connect(actions[i], [sd_actions[i]], 'all_to_all')
+action_readout = SpikeCountReadout(sd_actions)
 sd_all_actions = nest.Create('spike_detector')
 nest.Connect(all_actions, sd_all_actions, 'all_to_all')
 
@@ -115,20 +112,12 @@ while actions_executed < NUM_ITERATIONS:
         state = env.getState().copy()
         print 'difference: ', state['diff']
 
-        if(state['diff'] >= 0):
-            nest.SetStatus([sensors['right']], {'rate':diff_K*state['diff']})
-        else:
-            nest.SetStatus([sensors['left']], {'rate':-diff_K*state['diff']})
-        nest.SetStatus(noise, {'rate': 3000. })
+        left_rate, right_rate = difference_rates(state['diff'], diff_K)
+        rate_encoder.set_rates([left_rate, right_rate] + [3000.] * len(noise))
 
         nest.Simulate(100)
-        max_rate = -1
-        chosen_action = -1
-        for i in range(len(sd_actions)):
-            rate = len([e for e in nest.GetStatus([sd_actions[i]], keys='events')[0]['times'] if e > last_action_time])
-            if rate > max_rate:
-                max_rate = rate # the population with the hightes rate wins
-                chosen_action = i
+        # the population with the highest rate wins
+        chosen_action, max_rate = action_readout.winner()
 
         possible_actions = env.actionsAvailable
         FIRE_RATE_K = 0.5
@@ -138,8 +127,7 @@ while actions_executed < NUM_ITERATIONS:
         print "new pos:", new_position, "reward:", outcome
 
         # increase a weight of fired sensor neurons
-        events = nest.GetStatus(sd_all, keys='events')[0]
-        senders = [ j for (i,j) in zip(events['times'],events['senders']) if i > last_action_time ]
+        senders = window_readout.senders().tolist()
         if(len(senders) > 0):
             #rplt.from_device(sd_all_actions, title="Actions")
             #rplt.from_device(sd_all, title="Difference neurons")
@@ -156,9 +144,7 @@ while actions_executed < NUM_ITERATIONS:
                 nest.SetStatus(conn, {'weight': ww})
 
         # stimulate new state
-        nest.SetStatus([sensors['right']], {'rate':0.})
-        nest.SetStatus([sensors['left']], {'rate':0.})
-        nest.SetStatus(noise, {'rate': 0. })
+        rate_encoder.set_rates(0.)
 
         nest.Simulate(50.)
         
@@ -170,12 +156,12 @@ while actions_executed < NUM_ITERATIONS:
             outcomes.append(positiveOutcomes/float(actions_executed))
 
         last_action_time += 150
+        action_readout.clear()
+        window_readout.clear()
     else:
         position = env.getState().copy()
         _, in_end_position = env.init_new_trial()
-        nest.SetStatus([sensors['right']], {'rate':0.})
-        nest.SetStatus([sensors['left']], {'rate':0.})
-        nest.SetStatus(noise, {'rate': 0. })
+        rate_encoder.set_rates(0.)
 
 SaveNetworkToFile("connections.dat", all_signals, all_actions)
 plt.plot(time, outcomes)
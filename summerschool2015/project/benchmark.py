@@ -0,0 +1,268 @@
+"""
+Benchmarks of the closed-loop building blocks.
+
+Measures with fixed seeds and the network sizes of 4_pong_training.py:
+
+    env         frames/s of the headless game and of a BatchGame, moves/s
+                of the grid world and the vectorized grid world
+    checkpoint  save and load time of a connection checkpoint and of the
+                TD tables
+    nest        wall time per 5 ms Simulate slice, spike readout cost,
+                weight update cost, decisions/s of the play loop in
+                lockstep with a headless game, network save and restore
+
+The nest section is skipped when NEST cannot be imported. Results are
+written as JSON together with the git commit, so runs on different
+commits can be compared:
+
+    python benchmark.py [results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import platform
+import subprocess
+import numpy as np
+
+SEED = 1234
+
+# sizes of 4_pong_training.py
+WORLD_DIM = {'y': 4, 'x': 4}
+NUM_ACTIONS = 3
+NUM_STATE_NEURONS = 20
+NUM_WTA_NEURONS = 50
+
+NUM_DECISIONS = 20
+BATCH_SIZE = 1000
+
+
+def measure(func, repeat):
+    """Calls func repeat times, returns statistics of the call time in s."""
+    times = np.empty(repeat)
+    for i in range(repeat):
+        start = time.time()
+        func()
+        times[i] = time.time() - start
+    return stats(times)
+
+
+def stats(times):
+    # statistics of the call times in s
+    return {'repeat': len(times), 'mean': float(times.mean()), 'median': float(np.median(times)),
+            'min': float(times.min()), 'max': float(times.max())}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_env():
+    from pong import pong_headless, pong_batch
+    from environment import Environment
+    from vector_environment import VectorEnvironment
+
+    results = {}
+    num_frames = 20000
+    game = pong_headless.Game(seed=SEED)
+    t = measure(lambda: [game.step() for i in range(num_frames)], 3)['median']
+    results['headless_frames_per_s'] = num_frames / t
+
+    batch = pong_batch.BatchGame(BATCH_SIZE, seed=SEED)
+    num_frames = 200
+    t = measure(lambda: [batch.step() for i in range(num_frames)], 3)['median']
+    results['batch_game_frames_per_s'] = BATCH_SIZE * num_frames / t
+
+    rng = np.random.RandomState(SEED)
+    env = Environment(9)
+    actions = env.get_possible_actions()
+    num_moves = 20000
+    choices = rng.randint(len(actions), size=num_moves)
+
+    def grid_moves():
+        for choice in choices:
+            env.move(actions[choice])
+            if env.agent_is_in_end_pos(env.get_agent_pos()):
+                env.init_new_trial()
+    t = measure(grid_moves, 3)['median']
+    results['grid_moves_per_s'] = num_moves / t
+
+    vector_env = VectorEnvironment(9, BATCH_SIZE)
+    num_steps = 200
+    vector_actions = rng.randint(vector_env.get_num_possible_actions(), size=(num_steps, BATCH_SIZE))
+
+    def vector_moves():
+        for step_actions in vector_actions:
+            _, _, is_end_pos = vector_env.move(step_actions)
+            vector_env.init_new_trial(is_end_pos)
+    t = measure(vector_moves, 3)['median']
+    results['vector_grid_moves_per_s'] = BATCH_SIZE * num_steps / t
+    return results
+
+
+def bench_checkpoint(directory):
+    from network_checkpoint import write_checkpoint, read_checkpoint
+    from td_checkpoint import save_table, load_table
+
+    # all state to action connections of 4_pong_training.py
+    rng = np.random.RandomState(SEED)
+    num_sources = WORLD_DIM['x'] * WORLD_DIM['y'] * NUM_STATE_NEURONS
+    num_targets = NUM_ACTIONS * NUM_WTA_NEURONS
+    source, target = np.meshgrid(np.arange(num_sources), np.arange(num_targets), indexing='ij')
+    columns = {'source': source.ravel() + 1, 'target': target.ravel() + num_sources + 1,
+               'weight': rng.rand(source.size), 'delay': np.ones(source.size)}
+    filename = os.path.join(directory, 'connections.dat')
+
+    results = {'connections': int(source.size)}
+    results['connections_save'] = measure(lambda: write_checkpoint(filename, columns), 10)
+    results['connections_load'] = measure(lambda: read_checkpoint(filename), 10)
+
+    policy = rng.rand(WORLD_DIM['y'], WORLD_DIM['x'], NUM_ACTIONS)
+    filename = os.path.join(directory, 'pong_policy.dat')
+    results['table_save'] = measure(lambda: save_table(filename, policy), 100)
+    results['table_load'] = measure(lambda: load_table(filename), 100)
+    return results
+
+
+def bench_nest(directory):
+    import nest
+    from pong import pong_headless
+    from spike_readout import SpikeCountReadout
+    from connection_index import ConnectionIndex, WeightBatch
+    from network_checkpoint import SaveNetworkToFile, RestoreNetworkFromFile
+
+    def build(connect_states=True):
+        # the network of 4_pong_training.py, without the state -> action
+        # connections if connect_states is False
+        nest.ResetKernel()
+        nest.set_verbosity("M_FATAL")
+        nest.SetKernelStatus({"local_num_threads": 1, "rng_seeds": [SEED + 1],
+                              "grng_seed": SEED, "resolution": 0.1})
+        states = [[nest.Create('iaf_psc_alpha', NUM_STATE_NEURONS) for j in range(WORLD_DIM['y'])]
+                  for i in range(WORLD_DIM['x'])]
+        all_states = np.ravel(states).tolist()
+        actions = [nest.Create('iaf_psc_alpha', NUM_WTA_NEURONS) for i in range(NUM_ACTIONS)]
+        all_actions = np.ravel(actions).tolist()
+        wta_inh_neurons = nest.Create('iaf_psc_alpha', NUM_WTA_NEURONS)
+        for population in actions:
+            nest.Connect(population, population, 'all_to_all', {'weight': 10.5})
+            nest.Connect(population, wta_inh_neurons, 'all_to_all', {'weight': 2.8})
+        nest.Connect(wta_inh_neurons, all_actions, 'all_to_all', {'weight': -2.6})
+        wta_noise = nest.Create('poisson_generator', 10, {'rate': 3000.})
+        nest.Connect(wta_noise, all_actions, 'all_to_all', {'weight': 2.1})
+        nest.Connect(wta_noise, wta_inh_neurons, 'all_to_all', {'weight': 2.1 * 0.9})
+        noise = nest.Create('poisson_generator', 1, {'rate': 65000.})
+        nest.Connect(noise, all_states, 'all_to_all', {'weight': 1.})
+        stimulus = nest.Create('poisson_generator', 1, {'rate': 5000.})
+        nest.Connect(stimulus, all_states, 'all_to_all', {'weight': 0.})
+        sd_actions = nest.Create('spike_detector', NUM_ACTIONS)
+        for i, population in enumerate(actions):
+            nest.Connect(population, [sd_actions[i]])
+        if connect_states:
+            nest.Connect(all_states, all_actions, 'all_to_all', {'weight': 0.0})
+        return (all_states, all_actions, wta_noise, SpikeCountReadout(sd_actions),
+                ConnectionIndex(stimulus, states, actions))
+
+    results = {}
+    start = time.time()
+    all_states, all_actions, wta_noise, readout, conn_index = build()
+    results['build_s'] = time.time() - start
+
+    nest.Simulate(100.)
+    results['simulate_slice'] = measure(lambda: nest.Simulate(5), 200)
+    results['readout'] = measure(readout.winner, 200)
+
+    position = {'y': 0, 'x': 0}
+    weights = np.arange(NUM_ACTIONS, dtype=float)
+
+    def update_weights():
+        batch = WeightBatch()
+        conn_index.set_action_weights(position, weights, batch)
+        conn_index.set_stimulus(position, 1., batch)
+        batch.flush()
+    results['weight_update'] = measure(update_weights, 100)
+
+    # the play loop of 4_pong_play.py in lockstep with a headless game
+    game = pong_headless.Game(seed=SEED)
+    frame = [game.get_state()]
+    directions = [1, 0, -1]
+
+    def discretize(value):
+        return min(WORLD_DIM['y'] - 1, int(value / (480 / WORLD_DIM['y'])))
+
+    def decision():
+        ball_x, ball_y, paddle = frame[0]
+        position = {'y': discretize(ball_y), 'x': discretize(paddle)}
+        conn_index.set_stimulus(position, 1.)
+        nest.SetStatus(wta_noise, {'rate': 3000.})
+        for t in range(8):
+            nest.Simulate(5)
+            frame[0] = game.step()
+            frame[0] = game.step()
+        chosen_action, max_rate = readout.winner()
+        move_direction = directions[chosen_action]
+        nest.SetStatus(wta_noise, {'rate': 0.})
+        for t in range(4):
+            nest.Simulate(5)
+            frame[0] = game.step(move_direction)
+            move_direction = None
+            frame[0] = game.step()
+        readout.clear()
+        conn_index.set_stimulus(position, 0.)
+    t = measure(decision, NUM_DECISIONS)
+    results['decision'] = t
+    results['decisions_per_s'] = 1. / t['median']
+
+    filename = os.path.join(directory, 'connections.dat')
+    results['network_save'] = measure(lambda: SaveNetworkToFile(filename, all_states, all_actions), 3)
+
+    # every restore needs a fresh network without the state -> action
+    # connections, only RestoreNetworkFromFile itself is timed
+    times = np.empty(3)
+    for i in range(len(times)):
+        build(connect_states=False)
+        start = time.time()
+        RestoreNetworkFromFile(filename)
+        times[i] = time.time() - start
+    results['network_restore'] = stats(times)
+    return results
+
+
+def main(output_filename=None):
+    commit = git_commit()
+    report = {'commit': commit, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'host': socket.gethostname(), 'python': platform.python_version(),
+              'numpy': np.__version__, 'seed': SEED}
+
+    directory = tempfile.mkdtemp()
+    report['env'] = bench_env()
+    report['checkpoint'] = bench_checkpoint(directory)
+    try:
+        import nest
+    except ImportError:
+        print "NEST not available, skipping the nest benchmarks"
+    else:
+        report['nest'] = bench_nest(directory)
+        report['nest_version'] = nest.version()
+    for filename in os.listdir(directory):
+        os.remove(os.path.join(directory, filename))
+    os.rmdir(directory)
+
+    if output_filename is None:
+        output_filename = "benchmark_%s.json" % (commit[:8] if commit else "unknown")
+    f = open(output_filename, 'w')
+    f.write(json.dumps(report, indent=2, sort_keys=True))
+    f.close()
+    print json.dumps(report, indent=2, sort_keys=True)
+    return report
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
@@ -0,0 +1,73 @@
+"""
+Precomputed connection handles of the discrete Q-learning networks.
+
+nest.GetConnections searches the whole connection table, so calling it
+for every stimulus switch and weight update dominates a training step.
+The index looks up the stimulus -> state and state -> action connections
+once after the network is built (or restored from a file) and keeps them
+by state position and action.
+
+Weight changes can be collected in a WeightBatch and written to the kernel
+with a single SetStatus call per action step.
+"""
+
+import numpy as np
+import nest
+
+
+class WeightBatch(object):
+
+    def __init__(self):
+        self.connections = []
+        self.weights = []
+
+    def add(self, connections, weights):
+        # weights is a single value for all connections or one per connection
+        self.connections.extend(connections)
+        self.weights.extend(np.broadcast_to(weights, (len(connections),)).tolist())
+
+    def flush(self):
+        # later entries win if a connection was added more than once
+        if self.connections:
+            nest.SetStatus(self.connections, 'weight', self.weights)
+        self.connections = []
+        self.weights = []
+
+
+class ConnectionIndex(object):
+
+    def __init__(self, stimulus, states, actions):
+        # states[x][y] and actions[i] are the populations as created by
+        # the training and play scripts
+        self.stimulus_connections = []
+        self.action_connections = []
+        for x in range(len(states)):
+            self.stimulus_connections.append([])
+            self.action_connections.append([])
+            for y in range(len(states[x])):
+                self.stimulus_connections[x].append(nest.GetConnections(stimulus, states[x][y]))
+                self.action_connections[x].append(
+                    [nest.GetConnections(states[x][y], actions[i]) for i in range(len(actions))])
+
+    def stimulus(self, position):
+        return self.stimulus_connections[position['x']][position['y']]
+
+    def action(self, position, action):
+        return self.action_connections[position['x']][position['y']][action]
+
+    def set_stimulus(self, position, weight, batch=None):
+        if batch is None:
+            nest.SetStatus(self.stimulus(position), {'weight': weight})
+        else:
+            batch.add(self.stimulus(position), weight)
+
+    def set_action_weights(self, position, weights, batch=None):
+        # weights holds one weight per action, all of them are written with
+        # one SetStatus call
+        own_batch = batch is None
+        if own_batch:
+            batch = WeightBatch()
+        for i in range(len(weights)):
+            batch.add(self.action(position, i), weights[i])
+        if own_batch:
+            batch.flush()
@@ -15,20 +15,145 @@ def check_valid_pos(agent_pos, outcomes):
     return True
 
 
+class Environment(object):
+
+    # One grid world with its own agent. Any number of them can be created
+    # in one process; the module level functions below use a default
+    # instance set up by set_environment.
+
+    def __init__(self, env=0):
+        self.outcomes, self.start_pos, self.end_pos = params.get_environment(env)
+        self.agent_pos = self.start_pos.copy()
+
+        self.states_visited = numpy.zeros(len(self.outcomes) * len(self.outcomes[0]))
+        self.states_visited = numpy.reshape(self.states_visited, [len(self.outcomes), len(self.outcomes[0])])
+
+        self.states_visited[self.agent_pos['y']][self.agent_pos['x']] += 1
+
+        self.num_possible_moves = numpy.zeros(len(self.outcomes) * len(self.outcomes[0]), int)
+        self.num_possible_moves = numpy.reshape(self.num_possible_moves, [len(self.outcomes), len(self.outcomes[0])])
+
+        # python switch case to move in a direction defined in the "directions" list
+        self.actions = {0: self.move_north,
+                        1: self.move_east,
+                        2: self.move_south,
+                        3: self.move_west}
+
+        self.possible_moves = []
+        if len(self.outcomes) == 1:
+            self.num_possible_moves += 2
+            self.possible_moves.append(self.actions[3])
+            self.possible_moves.append(self.actions[1])
+        else:
+            self.num_possible_moves += 4
+            self.possible_moves.append(self.actions[0])
+            self.possible_moves.append(self.actions[1])
+            self.possible_moves.append(self.actions[2])
+            self.possible_moves.append(self.actions[3])
+
+        self.is_end_pos = False
+        self.reward_collected = 0
+        self.punishment_collected = 0
+        self.num_actions = 0
+
+    def move_north(self):
+        self.agent_pos['y'] -= 1
+
+    def move_east(self):
+        self.agent_pos['x'] += 1
+
+    def move_south(self):
+        self.agent_pos['y'] += 1
+
+    def move_west(self):
+        self.agent_pos['x'] -= 1
+
+    def agent_is_in_end_pos(self, agent_pos):
+        for i in range(len(self.end_pos)):
+            if agent_pos == self.end_pos[i]:
+                return True
+        return False
+
+    def move(self, action):
+        agent_last_pos = self.agent_pos.copy()
+        self.num_actions += 1
+
+        action()
+
+        if not check_valid_pos(self.agent_pos, self.outcomes):
+            self.agent_pos = agent_last_pos
+            return ([self.agent_pos, -1, self.is_end_pos])
+
+        outcome = self.outcomes[self.agent_pos['y']][self.agent_pos['x']]
+        self.states_visited[self.agent_pos['y']][self.agent_pos['x']] += 1
+
+        if outcome > 0:
+            self.reward_collected = self.reward_collected + outcome
+        elif outcome < 0:
+            self.punishment_collected = self.punishment_collected - outcome
+
+        if self.agent_is_in_end_pos(self.agent_pos):
+            self.is_end_pos = True
+
+        return ([self.agent_pos, outcome, self.is_end_pos])
+
+    def init_new_trial(self):
+        self.is_end_pos = False
+        self.agent_pos = self.start_pos.copy()
+
+        return ([self.agent_pos, self.is_end_pos])
+
+    def get_world_dimensions(self):
+        dimensions = {'x': len(self.outcomes[0]), 'y': len(self.outcomes)}
+        return dimensions
+
+    def get_agent_pos(self):
+        return (self.agent_pos)
+
+    def get_num_possible_actions(self):
+        return self.num_possible_moves[0][1]
+
+    def get_possible_actions(self):
+        return self.possible_moves
+
+    def print_world(self):
+        print "\nWORLD\n"
+        for i in range(len(self.outcomes)):
+            o = ""
+            for j in range(len(self.outcomes[0])):
+                o = o + " " + str(int(self.outcomes[i][j]))
+            print o
+
+    def print_states_visited(self):
+        print "\nSTATES VISITED\n"
+        for i in range(len(self.states_visited)):
+            o = ""
+            for j in range(len(self.states_visited[0])):
+                o = o + " " + str(int(self.states_visited[i][j]))
+            print o
+
+    def print_result(self):
+        print "\nREWARD COLLECTED\n" + str(self.reward_collected)
+        print "\nPUNISHMENT COLLECTED\n" + str(self.punishment_collected)
+
+
+# default instance behind the module level functions
+default_environment = None
+
 def move_north():
-    agent_pos['y'] -= 1
+    default_environment.move_north()
 
 
 def move_east():
-    agent_pos['x'] += 1
+    default_environment.move_east()
 
 
 def move_south():
-    agent_pos['y'] += 1
+    default_environment.move_south()
 
 
 def move_west():
-    agent_pos['x'] -= 1
+    default_environment.move_west()
 
 # python switch case to move in a direction defined in the "directions" list
 actions = {0: move_north,
@@ -37,123 +162,42 @@ actions = {0: move_north,
            3: move_west}
 
 def set_environment(env):
-    global agent_pos, outcomes, reward_collected, punishment_collected, is_end_pos, num_actions, num_possible_moves, possible_moves, states_visited, end_pos, start_pos
+    global default_environment
     params.set_environment(env)
-
-    outcomes = params.outcomes
-    start_pos = params.start_pos
-    end_pos = params.end_pos
-    agent_pos = start_pos.copy()
-    
-    states_visited = numpy.zeros(len(params.outcomes) * len(params.outcomes[0]))
-    states_visited = numpy.reshape(states_visited, [len(params.outcomes), len(params.outcomes[0])])
-    
-    states_visited[agent_pos['y']][agent_pos['x']] += 1
-    
-    num_possible_moves = numpy.zeros(len(params.outcomes) * len(params.outcomes[0]), int)
-    num_possible_moves = numpy.reshape(num_possible_moves, [len(params.outcomes), len(params.outcomes[0])])
-    
-    possible_moves = []
-    if len(outcomes) == 1:
-        num_possible_moves += 2
-        possible_moves.append(actions[3])
-        possible_moves.append(actions[1])
-    else:
-        num_possible_moves += 4
-        possible_moves.append(actions[0])
-        possible_moves.append(actions[1])
-        possible_moves.append(actions[2])
-        possible_moves.append(actions[3])
-    
-    
-    is_end_pos = False
-    reward_collected = 0
-    punishment_collected = 0
-    num_actions = 0
+    default_environment = Environment(env)
 
 def agent_is_in_end_pos(agent_pos):
-    for i in range(len(end_pos)):
-        if agent_pos == end_pos[i]:
-            return True
-    return False
+    return default_environment.agent_is_in_end_pos(agent_pos)
 
 def move(action):
-    global agent_pos, outcomes, reward_collected, punishment_collected, is_end_pos, num_actions
-    agent_last_pos = agent_pos.copy()
-    num_actions += 1
-#    if num_actions > 20:
-#        print outcomes
-#        for i in range(len(outcomes)):
-#            for j in range(len(outcomes[i])):
-#                outcomes[i][j] *= -1
-#        print outcomes
-#        num_actions = -10000
-    
-
-    action()
-    
-    if not check_valid_pos(agent_pos, outcomes):
-       	agent_pos = agent_last_pos
-        return ([agent_pos, -1, is_end_pos])
-    
-    
-    outcome = outcomes[agent_pos['y']][agent_pos['x']]
-    states_visited[agent_pos['y']][agent_pos['x']] += 1
-    
-    if outcome > 0:
-        reward_collected = reward_collected + outcome
-    elif outcome < 0:
-        punishment_collected = punishment_collected - outcome
-    
-    if agent_is_in_end_pos(agent_pos):
-    	is_end_pos = True
-
-    return ([agent_pos, outcome, is_end_pos])
+    return default_environment.move(action)
 
 def init_new_trial():
-	global is_end_pos, agent_pos, outcomes, reward_collected, punishment_collected
-	is_end_pos = False
-	agent_pos = start_pos.copy()
-
-	return ([agent_pos, is_end_pos])
+    return default_environment.init_new_trial()
 
 def get_world_dimensions():
-    global outcomes
-    dimensions = {'x': len(outcomes[0]), 'y': len(outcomes)}
-    return dimensions
+    return default_environment.get_world_dimensions()
 
 
 def get_agent_pos():
-    global agent_pos
-    return (agent_pos)
+    return default_environment.get_agent_pos()
 
 
 def get_num_possible_actions():
-	return num_possible_moves[0][1]
+    return default_environment.get_num_possible_actions()
 
 def print_world():
-    print "\nWORLD\n"
-    for i in range(len(outcomes)):
-        o = ""
-        for j in range(len(outcomes[0])):
-            o = o + " " + str(int(outcomes[i][j]))
-        print o
+    default_environment.print_world()
 
 
 def print_states_visited():
-    print "\nSTATES VISITED\n"
-    for i in range(len(states_visited)):
-        o = ""
-        for j in range(len(states_visited[0])):
-            o = o + " " + str(int(states_visited[i][j]))
-        print o
+    default_environment.print_states_visited()
 
 #def save_states_visited():
 #    tools.log(json.dumps(states_visited.tolist()), sparams.states_visited_filename)
 
 def print_result():
-    print "\nREWARD COLLECTED\n" + str(reward_collected)
-    print "\nPUNISHMENT COLLECTED\n" + str(punishment_collected)
+    default_environment.print_result()
 
 
 #def print_result_to_log():
@@ -167,6 +211,6 @@ def print_result():
 #    tools.log(json.dumps(outcomes), sparams.world_filename)
 
 def get_possible_actions():
-    return possible_moves
+    return default_environment.get_possible_actions()
 
 
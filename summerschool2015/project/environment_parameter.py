@@ -14,6 +14,11 @@ global outcomes, start_pos, end_pos
  
 def set_environment(env = 0):
     global outcomes, start_pos, end_pos
+    outcomes, start_pos, end_pos = get_environment(env)
+
+def get_environment(env = 0):
+    # returns (outcomes, start_pos, end_pos) of the environment without
+    # touching the module globals
     if env == 0:
         outcomes = [[1.0, 0, -1.0]]
         start_pos = {'x':1, 'y':0}
@@ -81,9 +86,4 @@ def set_environment(env = 0):
         start_pos = {'x':0, 'y':0}
         end_pos = [{'x':1, 'y':0}, {'x':2, 'y':0}, {'x':3, 'y':0}, {'x':4, 'y':0}]
 
-
-
-
-
-
-
+    return outcomes, start_pos, end_pos
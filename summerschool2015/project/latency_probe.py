@@ -0,0 +1,118 @@
+"""
+Timing probes for the sense -> decide -> act loop of the play scripts.
+
+Every stage (state age, getState, Simulate, readout, move, ...) records
+its durations into a histogram with logarithmic bins, so the percentiles
+of each stage can be compared with the reaction time budget. Probes are
+off unless PONG_PROFILE=1 is set; then the histograms are printed when
+the process exits, and with PONG_PROFILE_FILE=<file> every sample is also
+streamed to that file as "stage wall_time seconds" lines.
+
+    with latency_probe.probe('simulate'):
+        nest.Simulate(5)
+
+    latency_probe.record('state_age', time.time() - frame_time)
+
+When disabled, probe() returns one shared object that does nothing and
+record() returns at once.
+"""
+
+import os
+import time
+import atexit
+import numpy
+
+ENABLED = os.environ.get('PONG_PROFILE') == '1'
+STREAM_FILENAME = os.environ.get('PONG_PROFILE_FILE')
+
+# 10 bins per decade from 1 us to 100 s
+BIN_EDGES = numpy.logspace(-6, 2, 81)
+
+
+class StageHistogram(object):
+
+    def __init__(self):
+        self.counts = numpy.zeros(len(BIN_EDGES) + 1, int)
+        self.num_samples = 0
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, seconds):
+        self.counts[numpy.searchsorted(BIN_EDGES, seconds)] += 1
+        self.num_samples += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        # upper edge of the bin holding the q-th percentile, at most the
+        # largest sample
+        index = numpy.searchsorted(numpy.cumsum(self.counts), q / 100. * self.num_samples)
+        return min(BIN_EDGES[min(index, len(BIN_EDGES) - 1)], self.max)
+
+
+histograms = {}
+_stream = None
+
+
+def record(stage, seconds):
+    global _stream
+    if not ENABLED:
+        return
+    if stage not in histograms:
+        histograms[stage] = StageHistogram()
+    histograms[stage].add(seconds)
+    if STREAM_FILENAME:
+        if _stream is None:
+            _stream = open(STREAM_FILENAME, 'a')
+        _stream.write("%s %.6f %.9f\n" % (stage, time.time(), seconds))
+
+
+class _Probe(object):
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.stage, time.time() - self.start)
+
+
+class _NullProbe(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_null_probe = _NullProbe()
+
+
+def probe(stage):
+    """Context manager timing the enclosed block as the given stage."""
+    if not ENABLED:
+        return _null_probe
+    return _Probe(stage)
+
+
+def report():
+    if not histograms:
+        return
+    print "%-12s %8s %10s %10s %10s %10s %10s" % ("stage [ms]", "samples", "mean",
+                                                  "p50", "p90", "p99", "max")
+    for stage in sorted(histograms):
+        h = histograms[stage]
+        print "%-12s %8d %10.3f %10.3f %10.3f %10.3f %10.3f" % (
+            stage, h.num_samples, h.total / h.num_samples * 1000.,
+            h.percentile(50) * 1000., h.percentile(90) * 1000.,
+            h.percentile(99) * 1000., h.max * 1000.)
+    if _stream is not None:
+        _stream.flush()
+
+
+if ENABLED:
+    atexit.register(report)
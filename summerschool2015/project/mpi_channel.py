@@ -0,0 +1,64 @@
+"""
+Typed latest-value channels between the competition ranks.
+
+States and actions are small fixed size integer vectors, so they are sent
+with the buffer based Send/Recv of mpi4py from preallocated NumPy arrays
+instead of pickling a dict or an int per message. A sender keeps at most
+one request in flight and waits for it before it reuses the buffer. A
+receiver coalesces: when several messages are queued it drains them with
+Iprobe and returns only the newest one.
+
+    # rank 0
+    states = MPISender(comm, 1, STATE_TAG, 2)
+    states.send([ball_y, paddle])
+    # rank 1
+    states = MPIReceiver(comm, 0, STATE_TAG, 2)
+    ball_y, paddle = states.recv()
+"""
+
+import numpy
+from mpi4py import MPI
+
+STATE_TAG = 1
+ACTION_TAG = 2
+
+
+class MPISender(object):
+
+    def __init__(self, comm, dest, tag, size):
+        self.comm = comm
+        self.dest = dest
+        self.tag = tag
+        self.buffer = numpy.zeros(size, dtype=numpy.intc)
+        self.request = None
+
+    def wait(self):
+        # completes the last send, after that the buffer may be changed
+        if self.request is not None:
+            self.request.Wait()
+            self.request = None
+
+    def send(self, values):
+        self.wait()
+        self.buffer[:] = values
+        self.request = self.comm.Isend([self.buffer, MPI.INT], dest=self.dest, tag=self.tag)
+
+
+class MPIReceiver(object):
+
+    def __init__(self, comm, source, tag, size):
+        self.comm = comm
+        self.source = source
+        self.tag = tag
+        self.buffer = numpy.zeros(size, dtype=numpy.intc)
+
+    def recv(self):
+        """
+        Blocks until a message arrives and returns the newest one, older
+        queued messages are dropped. The returned array is reused by the
+        next call.
+        """
+        self.comm.Recv([self.buffer, MPI.INT], source=self.source, tag=self.tag)
+        while self.comm.Iprobe(source=self.source, tag=self.tag):
+            self.comm.Recv([self.buffer, MPI.INT], source=self.source, tag=self.tag)
+        return self.buffer
@@ -1,9 +1,9 @@
 from mpi4py import MPI
 from mpi4py.MPI import ANY_SOURCE
+from mpi_channel import MPISender, MPIReceiver, STATE_TAG, ACTION_TAG
 import Queue
 import threading
 import numpy
-import time
 
 global state
 state = {'y': 1, 'x':0}
@@ -12,17 +12,26 @@ world_dim = {'y':4, 'x': 4}
 comm = MPI.COMM_WORLD
 rank = comm.Get_rank()
 
+# the game runs on rank 0
+state_receiver = MPIReceiver(comm, 0, STATE_TAG, 2)
+action_sender = MPISender(comm, 0, ACTION_TAG, 1)
+
 class StateCommunicator(threading.Thread):
 
     def __init__(self):
         threading.Thread.__init__(self)
+        self.daemon = True
 
     def run(self):
         global state
         print "state commander running"
+        # rank 0 only sends when the state changed, so the blocking receive
+        # is all the waiting needed. Note that Open MPI busy-polls in
+        # blocking calls by default, run with
+        # OMPI_MCA_mpi_yield_when_idle=1 to let an idle rank give up the core.
         while True:
-            state = comm.recv()
-            time.sleep(0.1)
+            ball_y, paddle = state_receiver.recv()
+            state = {'y': int(ball_y), 'x': int(paddle)}
 
 state_comm = StateCommunicator()
 state_comm.start()
@@ -39,7 +48,7 @@ def getState():
 
 def move(direction):
     outcome = 0
-    comm.isend(direction())
+    action_sender.send(direction())
     return [state, outcome, False]
 
 def get_world_dimensions():
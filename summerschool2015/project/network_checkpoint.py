@@ -0,0 +1,105 @@
+"""
+Columnar checkpoints of trained connections.
+
+A checkpoint is an uncompressed NumPy .npz archive with one array per
+column (source, target, weight, delay) and a small header (format version
+and synapse model). Saving reads all connection properties with a single
+GetStatus call and restoring hands the arrays grouped by source to
+nest.DataConnect, so neither side builds one Python dict per synapse.
+
+Checkpoints written by the old JSON SaveNetworkToFile are still read
+transparently; convert_json_checkpoint rewrites them in the new format:
+
+    python network_checkpoint.py connections.dat [new_connections.dat]
+"""
+
+import os
+import sys
+import json
+import numpy as np
+
+# nest is only imported by the functions that talk to the kernel, so
+# checkpoints can be converted and merged without NEST installed.
+
+CHECKPOINT_VERSION = 1
+COLUMNS = ('source', 'target', 'weight', 'delay')
+
+
+def write_checkpoint(filename, columns, synapse_model="static_synapse"):
+    # write to a temporary file first so a crash never leaves half a file
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'wb') as f:
+        np.savez(f, version=np.array(CHECKPOINT_VERSION),
+                 synapse_model=np.array(synapse_model),
+                 source=np.asarray(columns['source'], dtype=np.int64),
+                 target=np.asarray(columns['target'], dtype=np.int64),
+                 weight=np.asarray(columns['weight'], dtype=np.float64),
+                 delay=np.asarray(columns['delay'], dtype=np.float64))
+    os.rename(tmp_filename, filename)
+
+
+def read_checkpoint(filename):
+    """
+    Returns the columns of a checkpoint as a dict of arrays and the
+    synapse model. Old JSON checkpoints are recognised and parsed.
+    """
+    with open(filename, 'rb') as f:
+        magic = f.read(2)
+
+    if magic == b'PK':
+        data = np.load(filename)
+        columns = dict((key, data[key]) for key in COLUMNS)
+        synapse_model = str(data['synapse_model'])
+        data.close()
+        return columns, synapse_model
+
+    f = open(filename, 'r')
+    status = json.loads(f.read())
+    f.close()
+    columns = {'source': np.array([s['source'] for s in status], dtype=np.int64),
+               'target': np.array([s['target'] for s in status], dtype=np.int64),
+               'weight': np.array([s['weight'] for s in status], dtype=np.float64),
+               'delay': np.array([s['delay'] for s in status], dtype=np.float64)}
+    synapse_model = status[0]['synapse_model'] if status else "static_synapse"
+    return columns, str(synapse_model)
+
+
+def convert_json_checkpoint(json_filename, checkpoint_filename=None):
+    # converts in place if no new filename is given
+    if checkpoint_filename is None:
+        checkpoint_filename = json_filename
+    columns, synapse_model = read_checkpoint(json_filename)
+    write_checkpoint(checkpoint_filename, columns, synapse_model)
+
+
+def SaveNetworkToFile(filename, source, target):
+    import nest
+
+    connections = nest.GetConnections(source, target)
+    status = np.array(nest.GetStatus(connections, list(COLUMNS)), dtype=np.float64)
+    status = status.reshape(-1, len(COLUMNS))
+    columns = dict((key, status[:, i]) for i, key in enumerate(COLUMNS))
+    write_checkpoint(filename, columns)
+
+
+def RestoreNetworkFromFile(filename):
+    import nest
+
+    if not os.path.exists(filename):
+        return
+    columns, synapse_model = read_checkpoint(filename)
+    if len(columns['source']) == 0:
+        return
+
+    # DataConnect takes one dict of target/weight/delay arrays per source
+    order = np.argsort(columns['source'], kind='mergesort')
+    sources, first = np.unique(columns['source'][order], return_index=True)
+    params = []
+    for key in ('target', 'weight', 'delay'):
+        params.append(np.split(columns[key][order].astype(np.float64), first[1:]))
+    params = [{'target': t, 'weight': w, 'delay': d} for t, w, d in zip(*params)]
+    nest.DataConnect(sources.tolist(), params, synapse_model)
+
+
+if __name__ == '__main__':
+    convert_json_checkpoint(*sys.argv[1:3])
@@ -75,31 +75,21 @@ class Game(sge.Game):
 class ComputerPlayer(sge.StellarClass):
     action_lock = None
     action_queue = None
-    state_lock = None
-    state_queue = None
+    state_channel = None
     
-    def __init__(self, action_lock, action_queue, state_lock, state_queue):
+    def __init__(self, action_lock, action_queue, state_channel):
         x = sge.game.width - 32
         y = 0# sge.game.height / 2
         self.hit_direction = -1
         glob.computer_player = self
         self.action_lock = action_lock
         self.action_queue = action_queue
-        self.state_lock = state_lock 
-        self.state_queue = state_queue
+        self.state_channel = state_channel
         super(ComputerPlayer, self).__init__(x,y, sprite="paddle_pc")
     
     def event_step(self, time_passed, delta_mult):
-        self.state_lock.acquire()
-        while not self.state_queue.empty():
-             # clear queue first
-             self.state_queue.get()
-             
-        # put new state
-        self.state_queue.put(glob.ball.x)
-        self.state_queue.put(glob.ball.y)
-        self.state_queue.put(glob.computer_player.y)
-        self.state_lock.release()
+        # publish new state
+        self.state_channel.write((glob.ball.x, glob.ball.y, glob.computer_player.y))
 
         if not self.action_queue.empty():
             self.action_lock.acquire()
@@ -199,7 +189,7 @@ class Ball(sge.StellarClass):
 
 
 
-def main( action_lock, action_queue, state_lock, state_queue): 
+def main( action_lock, action_queue, state_channel): 
 	# Create Game object
 	Game(640, 480, fps=120)
 	
@@ -227,7 +217,7 @@ def main( action_lock, action_queue, state_lock, state_queue):
 	
 	# Create objects
 	Player(1)
-	ComputerPlayer(action_lock, action_queue, state_lock, state_queue)
+	ComputerPlayer(action_lock, action_queue, state_channel)
 	glob.ball = Ball()
 	
 	objects = (glob.player1, glob.computer_player, glob.ball)
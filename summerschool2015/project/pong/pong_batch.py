@@ -0,0 +1,149 @@
+# Vectorized batch Pong simulator.
+#
+# Runs N independent games of pong_headless.Game side by side. Positions
+# and velocities live in structure-of-arrays NumPy buffers and a single
+# call to BatchGame.step() applies paddle movement, scoring/serve, wall
+# bounce and paddle collisions to all games at once. BALL_START_SPEED,
+# PADDLE_VERTICAL_FORCE and STATE_DIMENSIONS may be given per game, so a
+# parameter sweep can be run as one batch.
+
+import numpy as np
+
+from . import pong_headless as headless
+
+BALL_RADIUS = 12
+PADDLE_HALF_WIDTH = 4
+PLAYER_X = 32
+PLAYER_HALF_HEIGHT = 60
+
+
+class BatchGame(object):
+
+    def __init__(self, num_games, ball_start_speed=headless.BALL_START_SPEED,
+                 paddle_vertical_force=headless.PADDLE_VERTICAL_FORCE,
+                 state_dimensions=headless.STATE_DIMENSIONS,
+                 width=headless.SCREEN_WIDTH, height=headless.SCREEN_HEIGHT, seed=None):
+        n = num_games
+        self.num_games = n
+        self.width = width
+        self.height = height
+        self.random = np.random.RandomState(seed)
+
+        # per game parameters, scalars are broadcast to all games
+        self.ball_start_speed = np.ones(n) * ball_start_speed
+        self.paddle_vertical_force = np.ones(n) * paddle_vertical_force
+        self.state_dimensions = np.ones(n, int) * state_dimensions
+        # integer division as in pong.py
+        self.paddle_size = (480 // self.state_dimensions).astype(float)
+        self.computer_paddle_speed = self.paddle_size.copy()
+
+        self.ball_x = np.zeros(n)
+        self.ball_y = np.zeros(n)
+        self.ball_xvelocity = np.zeros(n)
+        self.ball_yvelocity = np.zeros(n)
+        self.paddle_x = np.ones(n) * (width - 32)
+        self.paddle_y = np.zeros(n)
+        self.player_y = np.ones(n) * (height / 2)
+
+        # number of times each game's computer paddle returned the ball
+        self.hits = np.zeros(n, int)
+        # number of serves after the ball left the field on either side
+        self.serves = np.zeros(n, int)
+
+        self.serve(np.ones(n, bool))
+        self.serves[:] = 0
+
+    def serve(self, mask):
+        count = np.count_nonzero(mask)
+        if count == 0:
+            return
+        self.ball_x[mask] = 50
+        self.ball_y[mask] = self.random.randint(40, 440, size=count)
+        self.ball_xvelocity[mask] = self.ball_start_speed[mask]
+        self.ball_yvelocity[mask] = 0
+        self.serves[mask] += 1
+
+    def get_raw_state(self):
+        # copies of what every ComputerPlayer publishes in a frame
+        return (self.ball_x.copy(), self.ball_y.copy(), self.paddle_y.copy())
+
+    def discretize(self, ball_y, paddle_y):
+        # same binning as pong_environment_play.getState
+        dims = self.state_dimensions
+        cell = 480 // dims
+        y = np.minimum(dims - 1, np.trunc(ball_y / cell).astype(int))
+        x = np.minimum(dims - 1, np.trunc(paddle_y / cell).astype(int))
+        return y, x
+
+    def get_state_indices(self):
+        return self.discretize(self.ball_y, self.paddle_y)
+
+    def get_states(self):
+        y, x = self.get_state_indices()
+        return [{'y': int(y[i]), 'x': int(x[i])} for i in range(self.num_games)]
+
+    def step(self, move_direction=None):
+        """
+        Advances every game by one frame.
+
+        move_direction holds one action (1, 0 or -1) per game, or is None
+        if no game takes an action this frame. Returns the discretized
+        {'y', 'x'} state indices of the frame start as two arrays, which
+        is what pong_environment_play.getState would read for each game.
+        """
+        state = self.discretize(self.ball_y, self.paddle_y)
+        height = self.height
+
+        # Computer player
+        if move_direction is None:
+            yvelocity = 0.
+        else:
+            yvelocity = np.asarray(move_direction) * self.computer_paddle_speed
+
+        half = self.paddle_size / 2.0
+        top = self.paddle_y - half < 0
+        bottom = ~top & (self.paddle_y + half > height)
+        self.paddle_y[top] = half[top]
+        self.paddle_y[bottom] = height - half[bottom]
+        self.paddle_y += yvelocity
+
+        # Ball: scoring
+        out = ((self.ball_x + BALL_RADIUS < 0) |
+               (self.ball_x - BALL_RADIUS > self.width))
+        self.serve(out)
+
+        # Ball: bouncing off of the edges
+        bottom = self.ball_y + BALL_RADIUS > height
+        top = ~bottom & (self.ball_y - BALL_RADIUS < 0)
+        self.ball_y[bottom] = height - BALL_RADIUS
+        self.ball_yvelocity[bottom] = -np.abs(self.ball_yvelocity[bottom])
+        self.ball_y[top] = BALL_RADIUS
+        self.ball_yvelocity[top] = np.abs(self.ball_yvelocity[top])
+
+        self.ball_x += self.ball_xvelocity
+        self.ball_y += self.ball_yvelocity
+
+        # Ball: collision with the human player, who never moves
+        hit = self._collides(PLAYER_X, self.player_y, PLAYER_HALF_HEIGHT)
+        self.ball_x[hit] = PLAYER_X + PADDLE_HALF_WIDTH + 1 + BALL_RADIUS
+        self.ball_xvelocity[hit] = np.minimum(
+            np.abs(self.ball_xvelocity[hit]) + headless.BALL_ACCELERATION, headless.BALL_MAX_SPEED)
+        self.ball_yvelocity[hit] += ((self.ball_y[hit] - self.player_y[hit]) *
+                                     (self.paddle_vertical_force[hit] + 0.01))
+
+        # Ball: collision with the computer player
+        hit = self._collides(self.paddle_x, self.paddle_y, half)
+        self.ball_x[hit] = self.paddle_x[hit] - PADDLE_HALF_WIDTH - 1 - BALL_RADIUS
+        self.ball_xvelocity[hit] = np.maximum(
+            -np.abs(self.ball_xvelocity[hit]) - headless.BALL_ACCELERATION, -headless.BALL_MAX_SPEED)
+        self.ball_yvelocity[hit] += ((self.ball_y[hit] - self.paddle_y[hit]) *
+                                     (self.paddle_vertical_force[hit] + 0.01))
+        self.hits += hit
+
+        return state
+
+    def _collides(self, paddle_x, paddle_y, paddle_half_height):
+        return ((self.ball_x - BALL_RADIUS < paddle_x + PADDLE_HALF_WIDTH) &
+                (self.ball_x + BALL_RADIUS > paddle_x - PADDLE_HALF_WIDTH) &
+                (self.ball_y - BALL_RADIUS < paddle_y + paddle_half_height) &
+                (self.ball_y + BALL_RADIUS > paddle_y - paddle_half_height))
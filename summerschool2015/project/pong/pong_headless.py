@@ -0,0 +1,243 @@
+# Render-free Pong physics core.
+#
+# Mirrors the Ball, ComputerPlayer and Player classes of pong.py without
+# the SGE display stack, so a game can be stepped as fast as the CPU
+# allows or run on machines without a display. One call to Game.step()
+# corresponds to one SGE frame at delta_mult == 1: every object runs its
+# event_step and moves by its velocity in the order the objects are put
+# into the room, then the ball is checked for collisions with the paddles.
+
+import time
+import numpy.random as random
+
+STATE_DIMENSIONS = 4
+
+SCREEN_WIDTH = 640
+SCREEN_HEIGHT = 480
+PADDLE_SPEED = 8
+COMPUTER_PADDLE_SPEED = 480 / STATE_DIMENSIONS
+PADDLE_VERTICAL_FORCE = 1 / 12
+BALL_START_SPEED = 4
+BALL_ACCELERATION = 0.2
+BALL_MAX_SPEED = 15
+
+paddle_size = COMPUTER_PADDLE_SPEED
+
+
+class Body(object):
+
+    # Minimal stand-in for sge.StellarClass: a position, a velocity and
+    # a bounding box given by the sprite size and origin.
+
+    def __init__(self, game, x, y, width, height, origin_x, origin_y):
+        self.game = game
+        self.x = x
+        self.y = y
+        self.xvelocity = 0
+        self.yvelocity = 0
+        self.width = width
+        self.height = height
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+
+    @property
+    def bbox_left(self):
+        return self.x - self.origin_x
+
+    @bbox_left.setter
+    def bbox_left(self, value):
+        self.x = value + self.origin_x
+
+    @property
+    def bbox_right(self):
+        return self.x - self.origin_x + self.width
+
+    @bbox_right.setter
+    def bbox_right(self, value):
+        self.x = value + self.origin_x - self.width
+
+    @property
+    def bbox_top(self):
+        return self.y - self.origin_y
+
+    @bbox_top.setter
+    def bbox_top(self, value):
+        self.y = value + self.origin_y
+
+    @property
+    def bbox_bottom(self):
+        return self.y - self.origin_y + self.height
+
+    @bbox_bottom.setter
+    def bbox_bottom(self, value):
+        self.y = value + self.origin_y - self.height
+
+    def collides(self, other):
+        return (self.bbox_left < other.bbox_right and
+                self.bbox_right > other.bbox_left and
+                self.bbox_top < other.bbox_bottom and
+                self.bbox_bottom > other.bbox_top)
+
+    def move(self):
+        self.x += self.xvelocity
+        self.y += self.yvelocity
+
+
+class ComputerPlayer(Body):
+
+    def __init__(self, game):
+        super(ComputerPlayer, self).__init__(game, game.width - 32, 0, 8,
+                                             paddle_size, 4, paddle_size / 2.0)
+        self.hit_direction = -1
+
+    def event_step(self, move_direction=None):
+        if move_direction is not None:
+            self.yvelocity = move_direction * COMPUTER_PADDLE_SPEED
+        else:
+            self.yvelocity = 0
+
+        # Keep the paddle inside the window
+        if self.bbox_top < 0:
+            self.bbox_top = 0
+        elif self.bbox_bottom > self.game.height:
+            self.bbox_bottom = self.game.height
+
+
+class Player(Body):
+
+    # Without a keyboard the human paddle never moves; it is kept so the
+    # ball can bounce back exactly as it does against an idle player.
+
+    def __init__(self, game):
+        super(Player, self).__init__(game, 32, game.height / 2, 8, 120, 4, 60)
+        self.hit_direction = 1
+
+    def event_step(self):
+        self.yvelocity = 0
+
+        # Keep the paddle inside the window
+        if self.bbox_top < 0:
+            self.bbox_top = 0
+        elif self.bbox_bottom > self.game.height:
+            self.bbox_bottom = self.game.height
+
+
+class Ball(Body):
+
+    def __init__(self, game):
+        super(Ball, self).__init__(game, game.width / 2, game.height / 2, 24,
+                                   24, 12, 12)
+
+    def event_step(self):
+        # Scoring
+        if self.bbox_right < 0:
+            self.serve(1)
+        elif self.bbox_left > self.game.width:
+            self.serve(1)
+
+        # Bouncing off of the edges
+        if self.bbox_bottom > self.game.height:
+            self.bbox_bottom = self.game.height
+            self.yvelocity = -abs(self.yvelocity)
+        elif self.bbox_top < 0:
+            self.bbox_top = 0
+            self.yvelocity = abs(self.yvelocity)
+
+    def event_collision(self, other):
+        if other.hit_direction == 1:
+            self.bbox_left = other.bbox_right + 1
+            self.xvelocity = min(abs(self.xvelocity) + BALL_ACCELERATION, BALL_MAX_SPEED)
+        else:
+            self.bbox_right = other.bbox_left - 1
+            self.xvelocity = max(-abs(self.xvelocity) - BALL_ACCELERATION, -BALL_MAX_SPEED)
+
+        self.yvelocity += (self.y - other.y) * (PADDLE_VERTICAL_FORCE + 0.01)
+
+    def serve(self, direction=1):
+        self.x = 50
+        self.y = self.game.random.randint(40, 440)
+
+        self.xvelocity = BALL_START_SPEED
+        self.yvelocity = 0
+
+
+class Game(object):
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, seed=None):
+        self.width = width
+        self.height = height
+        # Without a seed the global numpy generator is used, like pong.py
+        if seed is None:
+            self.random = random
+        else:
+            self.random = random.RandomState(seed)
+
+        self.player1 = Player(self)
+        self.computer_player = ComputerPlayer(self)
+        self.ball = Ball(self)
+        self.ball.serve()
+        self.paddles = (self.player1, self.computer_player)
+
+    def get_state(self):
+        return (self.ball.x, self.ball.y, self.computer_player.y)
+
+    def step(self, move_direction=None):
+        """
+        Advances the game by one frame.
+
+        move_direction is the action the computer player takes from its
+        queue in this frame (1, 0 or -1), None if the queue was empty.
+        Returns the (ball_x, ball_y, paddle_y) triple the computer player
+        publishes at the beginning of the frame.
+        """
+        state = self.get_state()
+        ball = self.ball
+
+        self.player1.event_step()
+        self.player1.move()
+        self.computer_player.event_step(move_direction)
+        self.computer_player.move()
+
+        ball.event_step()
+        ball.move()
+        for paddle in self.paddles:
+            if ball.collides(paddle):
+                ball.event_collision(paddle)
+
+        return state
+
+
+def main(action_lock, action_queue, state_channel, fps=120, seed=None):
+    # Drop-in replacement for pong.main. With fps=None the frames are
+    # computed back to back instead of being paced to wall-clock time.
+    game = Game(seed=seed)
+    frame_time = 1.0 / fps if fps else 0.
+    next_frame = time.time()
+
+    while True:
+        move_direction = None
+        if not action_queue.empty():
+            action_lock.acquire()
+            move_direction = action_queue.get()
+            action_lock.release()
+
+        state_channel.write(game.step(move_direction))
+
+        if frame_time:
+            next_frame += frame_time
+            delay = next_frame - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.time()
+
+
+if __name__ == '__main__':
+    # Benchmark the bare physics when run on its own
+    game = Game(seed=0)
+    num_frames = 100000
+    start = time.time()
+    for i in range(num_frames):
+        game.step()
+    elapsed = time.time() - start
+    print("%d frames in %.2f s (%.0f fps)" % (num_frames, elapsed, num_frames / elapsed))
@@ -76,31 +76,21 @@ class Game(sge.Game):
 class ComputerPlayer(sge.StellarClass):
     action_lock = None
     action_queue = None
-    state_lock = None
-    state_queue = None
+    state_broadcast = None
     
-    def __init__(self, action_lock, action_queue, state_lock, state_queue):
+    def __init__(self, action_lock, action_queue, state_broadcast):
         x = sge.game.width - 32
         y = 0# sge.game.height / 2
         self.hit_direction = -1
         glob.computer_player = self
         self.action_lock = action_lock
         self.action_queue = action_queue
-        self.state_lock = state_lock 
-        self.state_queue = state_queue
+        self.state_broadcast = state_broadcast
         super(ComputerPlayer, self).__init__(x,y, sprite="paddle")
     
     def event_step(self, time_passed, delta_mult):
-        self.state_lock.acquire()
-        while not self.state_queue.empty():
-             # clear queue first
-             self.state_queue.get()
-             
-        # put new state
-        self.state_queue.put(glob.ball.y)
-        self.state_queue.put(glob.computer_player.y)
-        self.state_queue.put(glob.computer_player2.y)
-        self.state_lock.release()
+        # wakes up the threads waiting for a new state
+        self.state_broadcast.publish((glob.ball.y, glob.computer_player.y, glob.computer_player2.y))
 
         if not self.action_queue.empty():
             self.action_lock.acquire()
@@ -228,7 +218,7 @@ class Ball(sge.StellarClass):
 
 
 
-def main(  action_lock0, action_queue0, action_lock1, action_queue1, state_lock, state_queue): 
+def main(  action_lock0, action_queue0, action_lock1, action_queue1, state_broadcast): 
 	# Create Game object
 	Game(640, 480, fps=120)
 	
@@ -254,7 +244,7 @@ def main(  action_lock0, action_queue0, action_lock1, action_queue1, state_lock,
 	background = sge.Background (layers, "black")
 	
 	# Create objects
-	ComputerPlayer(action_lock0, action_queue0, state_lock, state_queue)
+	ComputerPlayer(action_lock0, action_queue0, state_broadcast)
 	ComputerPlayer2(action_lock1, action_queue1)
 	glob.ball = Ball()
 	
@@ -0,0 +1,73 @@
+# Render-free version of pong_vs.py.
+#
+# Two computer paddles play against each other: ComputerPlayer on the right
+# (the first controller of run_competition.py) and ComputerPlayer2 on the
+# left. The physics are the ones of pong_headless.py, the objects step in
+# the order pong_vs.py puts them into the room. On top of what pong_vs.py
+# shows, VsGame keeps the score and the length of every rally so matches
+# can be played without a display, e.g. by tournament.py.
+
+from . import pong_headless as headless
+
+
+class ComputerPlayer2(headless.ComputerPlayer):
+
+    def __init__(self, game):
+        super(ComputerPlayer2, self).__init__(game)
+        self.x = 32
+        self.hit_direction = 1
+
+
+class VsGame(object):
+
+    def __init__(self, width=headless.SCREEN_WIDTH, height=headless.SCREEN_HEIGHT, seed=None):
+        self.width = width
+        self.height = height
+        if seed is None:
+            self.random = headless.random
+        else:
+            self.random = headless.random.RandomState(seed)
+
+        self.computer_player = headless.ComputerPlayer(self)
+        self.computer_player2 = ComputerPlayer2(self)
+        self.ball = headless.Ball(self)
+        self.ball.serve()
+        self.paddles = (self.computer_player2, self.computer_player)
+
+        # score[0] are the points of the right paddle, score[1] of the left
+        self.score = [0, 0]
+        self.rallies = []
+        self.hits = 0
+
+    def get_state(self):
+        return (self.ball.y, self.computer_player.y, self.computer_player2.y)
+
+    def step(self, move_direction=None, move_direction2=None):
+        """
+        Advances the game by one frame. move_direction moves the right
+        paddle, move_direction2 the left one (1, 0, -1 or None). Returns
+        the (ball_y, paddle_y, paddle2_y) triple of the beginning of the
+        frame.
+        """
+        state = self.get_state()
+        ball = self.ball
+
+        self.computer_player2.event_step(move_direction2)
+        self.computer_player2.move()
+        self.computer_player.event_step(move_direction)
+        self.computer_player.move()
+
+        # the ball is served again as soon as it left the field
+        if ball.bbox_right < 0 or ball.bbox_left > self.width:
+            self.score[0 if ball.bbox_right < 0 else 1] += 1
+            self.rallies.append(self.hits)
+            self.hits = 0
+
+        ball.event_step()
+        ball.move()
+        for paddle in self.paddles:
+            if ball.collides(paddle):
+                ball.event_collision(paddle)
+                self.hits += 1
+
+        return state
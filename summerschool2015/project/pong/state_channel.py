@@ -0,0 +1,96 @@
+# Lock-free snapshot channel for the game state.
+#
+# One writer (the game) publishes fixed size frames of floats, one reader
+# (the controller) always gets the newest complete frame. The frame lives
+# in a preallocated shared buffer next to a sequence counter that is odd
+# while a write is in progress (a seqlock), so neither side takes a lock
+# and a reader can never see half of one frame and half of the next. The
+# buffer is allocated in shared memory and can be handed to a
+# multiprocessing.Process, so the game does not have to run in the
+# reader's process. Every frame carries the wall-clock time it was written,
+# so a reader can tell how old the state it acts on is.
+#
+# StateBroadcast is the counterpart for threads of one process that should
+# sleep until the state changes instead of polling it.
+
+import time
+import threading
+from multiprocessing.sharedctypes import RawArray
+
+
+class StateChannel(object):
+
+    def __init__(self, size=3):
+        self.size = size
+        # [sequence, write time, value_0, ..., value_size-1]
+        self._buffer = RawArray('d', size + 2)
+
+    @property
+    def sequence(self):
+        """Number of frames written so far (times two)."""
+        return int(self._buffer[0])
+
+    def write(self, values):
+        buf = self._buffer
+        sequence = buf[0]
+        buf[0] = sequence + 1
+        buf[1] = time.time()
+        buf[2:] = values
+        buf[0] = sequence + 2
+
+    def read(self):
+        """
+        Returns (sequence, values) of the newest complete frame. The
+        sequence is 0 as long as nothing has been written yet.
+        """
+        sequence, write_time, values = self.read_stamped()
+        return sequence, values
+
+    def read_stamped(self):
+        """Like read(), returns (sequence, write time, values)."""
+        buf = self._buffer
+        while True:
+            sequence = buf[0]
+            if sequence % 2 == 0:
+                write_time = buf[1]
+                values = buf[2:]
+                if buf[0] == sequence:
+                    return int(sequence), write_time, values
+            # the writer is in the middle of a frame
+            time.sleep(0)
+
+
+class StateBroadcast(object):
+    """
+    Newest state for threads that want to sleep until it changes.
+
+    The game publishes every frame, any number of relay threads block in
+    wait() on a condition variable until a frame newer than the last one
+    they saw arrives. Frames a slow reader misses are simply skipped.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._values = None
+
+    def publish(self, values):
+        with self._condition:
+            self._sequence += 1
+            self._values = values
+            self._condition.notify_all()
+
+    def read(self):
+        """Returns (sequence, values) of the newest frame without waiting."""
+        with self._condition:
+            return self._sequence, self._values
+
+    def wait(self, last_sequence=0, timeout=None):
+        """
+        Blocks until a frame newer than last_sequence has been published and
+        returns (sequence, values). On timeout the old frame is returned.
+        """
+        with self._condition:
+            if self._sequence <= last_sequence:
+                self._condition.wait(timeout)
+            return self._sequence, self._values
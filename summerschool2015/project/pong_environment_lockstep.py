@@ -0,0 +1,120 @@
+"""
+Lockstep version of pong_environment_play.
+
+The game does not run on its own clock here. It is the render-free
+pong_headless game, advanced by exactly the number of frames the
+controller asks for with step(), usually once per nest.Simulate slice.
+How far the game moves per decision therefore no longer depends on the
+load of the machine, nothing sleeps, and the same PONG_SEED replays the
+same game.
+
+The functions are the ones of pong_environment_play, so a play script
+only has to import this module instead and call env.step() after every
+simulation slice.
+"""
+
+import os
+import numpy
+from pong import pong_headless as pong
+
+# Frames per 5 ms simulation slice. The free running game advanced about
+# two of its 120 fps frames while a slice was simulated and slept 10 ms.
+FRAMES_PER_SLICE = 2
+
+seed = int(os.environ['PONG_SEED']) if 'PONG_SEED' in os.environ else None
+game = pong.Game(seed=seed)
+
+world_dim = {'y': 4, 'x': 4}
+
+num_possible_moves = numpy.zeros(world_dim['y'] * world_dim['x'], int)
+num_possible_moves = numpy.reshape(num_possible_moves, [world_dim['y'], world_dim['x']])
+num_possible_moves += 3
+
+# the action the game takes in its next frame, like the size 1 action
+# queue of the threaded environment
+pending_direction = None
+frame = game.get_state()
+frames_played = 0
+state = {'y': 1, 'x': 0}
+
+
+def step(frames=FRAMES_PER_SLICE):
+    """Advances the game by the given number of frames."""
+    global pending_direction, frame, frames_played
+    for i in range(frames):
+        frame = game.step(pending_direction)
+        pending_direction = None
+    frames_played += frames
+
+
+def get_num_possible_actions():
+    return num_possible_moves
+
+
+def get_world_dimensions():
+    return world_dim
+
+
+def getWorldDim():
+    return [world_dim['y'], world_dim['x']]
+
+
+def getActionDim():
+    return 3
+
+
+def move_up():
+    return 1
+
+
+def move_down():
+    return -1
+
+
+def stay():
+    return 0
+
+
+def get_possible_actions():
+    return [move_up, stay, move_down]
+
+
+def move(action):
+    global pending_direction
+    # replaces an action the game has not taken yet
+    pending_direction = action()
+    outcome = 0
+    return [getState(), outcome, False]
+
+
+def init_new_trial():
+    return [state, 0, False]
+
+
+def get_agent_pos():
+    return state
+
+
+def getState():
+    global state
+    ball_x, ball_y, paddle = frame
+    ball_y = min(world_dim['y']-1, int(ball_y/(480 / world_dim['y'])))
+    paddle = min(world_dim['x']-1, int(paddle/(480 / world_dim['x'])))
+    state = {'y': ball_y, 'x': paddle}
+    return state
+
+
+def print_world():
+    pass
+
+
+def print_states_visited():
+    pass
+
+
+def save_states_visited():
+    pass
+
+
+def print_world_file():
+    pass
@@ -1,10 +1,29 @@
 import Queue
 import threading
+import multiprocessing
 import time
-from pong import pong
+import os
 import numpy
 import sys
 
+# Without a display (or with PONG_HEADLESS=1) the game runs on the
+# render-free physics core instead of opening an SGE window.
+HEADLESS = os.environ.get('PONG_HEADLESS') == '1' or not os.environ.get('DISPLAY')
+
+# Frame rate of the headless game, None runs it as fast as the CPU allows
+HEADLESS_FPS = 120
+
+# With PONG_PROCESS=1 the game runs in its own process instead of a thread,
+# so its frame loop does not compete with the NEST simulation for the GIL.
+SEPARATE_PROCESS = os.environ.get('PONG_PROCESS') == '1'
+
+if HEADLESS:
+	from pong import pong_headless as pong
+else:
+	from pong import pong
+from pong.state_channel import StateChannel
+import latency_probe
+
 #sys.path.append("/home/philipp/opt/mpi4py/lib/python/")
 #sys.path.append("/users/weidel/opt/mpi4py/lib64/python/")
 
@@ -15,33 +34,59 @@ comm = MPI.COMM_WORLD
 rank = comm.Get_rank()
 size = comm.Get_size()
 
+def run_game(action_lock, action_queue, state_channel):
+	if HEADLESS:
+		pong.main(action_lock, action_queue, state_channel, fps=HEADLESS_FPS)
+	else:
+		pong.main(action_lock, action_queue, state_channel)
+
 class PongGame(threading.Thread):
 	action_lock = None
 	action_queue = None
-	state_lock = None
-	state_queue = None
+	state_channel = None
 
-	def __init__(self, action_lock, action_queue, state_lock, state_queue ):
+	def __init__(self, action_lock, action_queue, state_channel ):
 		self.action_lock = action_lock
 		self.action_queue = action_queue
-		self.state_lock = state_lock
-		self.state_queue = state_queue
+		self.state_channel = state_channel
 
 		threading.Thread.__init__(self)
 
 
 	def run(self):
-		pong.main(self.action_lock, self.action_queue, self.state_lock, self.state_queue)
+		run_game(self.action_lock, self.action_queue, self.state_channel)
+
+class PongProcess(multiprocessing.Process):
+	action_lock = None
+	action_queue = None
+	state_channel = None
+
+	def __init__(self, action_lock, action_queue, state_channel ):
+		self.action_lock = action_lock
+		self.action_queue = action_queue
+		self.state_channel = state_channel
+
+		multiprocessing.Process.__init__(self)
+		# do not outlive the controller
+		self.daemon = True
+
+
+	def run(self):
+		run_game(self.action_lock, self.action_queue, self.state_channel)
 
 if rank == size-1:
-	action_queue = Queue.Queue(1)
-	action_lock = threading.Lock()
-	
-	state_queue = Queue.Queue(3 * 1024)
-	state_lock = threading.Lock()
+	# ball_x, ball_y and paddle_y of the newest frame, shared memory works
+	# for both the thread and the process
+	state_channel = StateChannel(3)
 	
-	
-	pong_thread = PongGame( action_lock, action_queue, state_lock, state_queue )
+	if SEPARATE_PROCESS:
+		action_queue = multiprocessing.Queue(1)
+		action_lock = multiprocessing.Lock()
+		pong_thread = PongProcess( action_lock, action_queue, state_channel )
+	else:
+		action_queue = Queue.Queue(1)
+		action_lock = threading.Lock()
+		pong_thread = PongGame( action_lock, action_queue, state_channel )
 	
 	pong_thread.start()
 	
@@ -80,27 +125,26 @@ def move(action):
     direction = action() 
     print state, direction
     	
-    if not action_queue.empty():
+    # replace a pending action, the newest one always wins. The game only
+    # takes actions under action_lock, so while we hold it a full queue
+    # means a pending action; with a multiprocessing queue it can still be
+    # on its way through the pipe, so wait briefly for it instead of
+    # giving up after one get_nowait
+    with latency_probe.probe('move'):
     	action_lock.acquire()
-    	action_queue.get()
-    	action_lock.release()
-    
-    if action_queue.empty():
-    	action_lock.acquire()
-    	action_queue.put(direction)
+    	while True:
+    		try:
+    			action_queue.put_nowait(direction)
+    			break
+    		except Queue.Full:
+    			try:
+    				action_queue.get(timeout=0.01)
+    			except Queue.Empty:
+    				pass
     	action_lock.release()
     	
     outcome = 0
-    state_lock.acquire()
-    if not state_queue.empty():
-    	ball_x = state_queue.get()
-    	ball_y = min(world_dim['y']-1, int(state_queue.get()/(480 / world_dim['y'])))
-    	paddle = min(world_dim['x']-1, int(state_queue.get()/(480 / world_dim['x'])))
-    
-    	state = {'y': ball_y, 'x': paddle}
-    
-    state_lock.release()
-    
+    state = getState()
     
     return [state, outcome, False]
 
@@ -110,17 +154,30 @@ def init_new_trial():
 
 def getState():
 	global state
-	state_lock.acquire()
-	if not state_queue.empty():
-		ball_x = state_queue.get()
-		ball_y = min(world_dim['y']-1, int(state_queue.get()/(480 / world_dim['y'])))
-		paddle = min(world_dim['x']-1, int(state_queue.get()/(480 / world_dim['x'])))
+	if latency_probe.ENABLED:
+		return getStateProfiled()
+	sequence, frame = state_channel.read()
+	if sequence:
+		updateState(frame)
+	return state
 
-		state = {'y': ball_y, 'x': paddle}
+def getStateProfiled():
+	start = time.time()
+	sequence, frame_time, frame = state_channel.read_stamped()
+	if sequence:
+		# how long ago the game published the frame
+		latency_probe.record('state_age', start - frame_time)
+		updateState(frame)
+	latency_probe.record('get_state', time.time() - start)
+	return state
 
-	state_lock.release()
+def updateState(frame):
+	global state
+	ball_x, ball_y, paddle = frame
+	ball_y = min(world_dim['y']-1, int(ball_y/(480 / world_dim['y'])))
+	paddle = min(world_dim['x']-1, int(paddle/(480 / world_dim['x'])))
 
-	return state
+	state = {'y': ball_y, 'x': paddle}
 
 
 def print_world():
@@ -2,6 +2,7 @@ import Queue
 import threading
 import time
 from pong import pong_vs as pong
+from pong.state_channel import StateBroadcast
 import numpy
 import sys
 
@@ -13,25 +14,23 @@ rank = comm.Get_rank()
 size = comm.Get_size()
 
 class PongGame(threading.Thread):
-	state_lock = None
-	state_queue = None
+	state_broadcast = None
 	action_lock0 = None
 	action_queue0 = None
 	action_lock1 = None
 	action_queue1 = None
 
-	def __init__(self, action_lock0, action_queue0, action_lock1, action_queue1, state_lock, state_queue ):
+	def __init__(self, action_lock0, action_queue0, action_lock1, action_queue1, state_broadcast ):
 		self.action_lock0 = action_lock0
 		self.action_queue0 = action_queue0
 		self.action_lock1 = action_lock1
 		self.action_queue1 = action_queue1
-		self.state_lock = state_lock
-		self.state_queue = state_queue
+		self.state_broadcast = state_broadcast
 
 		threading.Thread.__init__(self)
 
 	def run(self):
-		pong.main(self.action_lock0, self.action_queue0, self.action_lock1, self.action_queue1, self.state_lock, self.state_queue)
+		pong.main(self.action_lock0, self.action_queue0, self.action_lock1, self.action_queue1, self.state_broadcast)
 
 if rank == size-1:
 	action_queue0 = Queue.Queue(1)
@@ -39,10 +38,9 @@ if rank == size-1:
 	action_queue1 = Queue.Queue(1)
 	action_lock1 = threading.Lock()
 	
-	state_queue = Queue.Queue(3 * 1024)
-	state_lock = threading.Lock()
+	state_broadcast = StateBroadcast()
 	
-	pong_thread = PongGame(  action_lock0, action_queue0, action_lock1, action_queue1, state_lock, state_queue )
+	pong_thread = PongGame(  action_lock0, action_queue0, action_lock1, action_queue1, state_broadcast )
 	pong_thread.start()
 	
 	print "Pong started"
@@ -97,27 +95,18 @@ def move(action):
     direction = action() 
     print state, direction
     	
-    if not action_queue.empty():
-    	action_lock.acquire()
-    	action_queue.get()
-    	action_lock.release()
+    if not action_queue0.empty():
+    	action_lock0.acquire()
+    	action_queue0.get()
+    	action_lock0.release()
     
-    if action_queue.empty():
-    	action_lock.acquire()
-    	action_queue.put(direction)
-    	action_lock.release()
+    if action_queue0.empty():
+    	action_lock0.acquire()
+    	action_queue0.put(direction)
+    	action_lock0.release()
     	
     outcome = 0
-    state_lock.acquire()
-    if not state_queue.empty():
-    	ball_x = state_queue.get()
-    	ball_y = min(world_dim['y']-1, int(state_queue.get()/(480 / world_dim['y'])))
-    	paddle = min(world_dim['x']-1, int(state_queue.get()/(480 / world_dim['x'])))
-    
-    	state = {'y': ball_y, 'x': paddle}
-    
-    state_lock.release()
-    
+    getState()
     
     return [state, outcome, False]
 
@@ -127,16 +116,15 @@ def init_new_trial():
 
 def getState():
 	global state
-	state_lock.acquire()
-	if not state_queue.empty():
-		ball_x = state_queue.get()
-		ball_y = min(world_dim['y']-1, int(state_queue.get()/(480 / world_dim['y'])))
-		paddle = min(world_dim['x']-1, int(state_queue.get()/(480 / world_dim['x'])))
+	# pong_vs publishes (ball.y, computer_player.y, computer_player2.y):
+	# frame[0] is the ball, frame[1] the right paddle this environment moves
+	sequence, frame = state_broadcast.read()
+	if sequence > 0:
+		ball_y = min(world_dim['y']-1, int(frame[0]/(480 / world_dim['y'])))
+		paddle = min(world_dim['x']-1, int(frame[1]/(480 / world_dim['x'])))
 
 		state = {'y': ball_y, 'x': paddle}
 
-	state_lock.release()
-
 	return state
 
 
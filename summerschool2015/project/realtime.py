@@ -0,0 +1,70 @@
+"""
+Real-time pacing of the NEST play loops.
+
+The play scripts used to sleep a fixed 10 ms after every 5 ms Simulate
+slice, which wasted the time the simulation itself took and let the
+network fall behind the game when the machine was loaded. A
+RealTimePacer keeps simulated time at a fixed ratio to wall-clock time
+instead: after each slice wait(sim_ms) sleeps only for what is left of
+the slice's wall-clock budget. A slice that ends past its deadline is
+counted as a miss and the schedule restarts from the current time rather
+than catching up with a burst of unpaced slices, so a live demo stays
+responsive. Misses are reported every REPORT_INTERVAL seconds.
+
+    pacer = RealTimePacer()
+    for t in range(8):
+        nest.Simulate(5)
+        pacer.wait(5)
+"""
+
+import os
+import time
+
+# simulated ms per wall-clock ms. 0.5 is the pace of the old 5 ms slices
+# with 10 ms sleeps; PONG_REALTIME_RATIO overrides it
+DEFAULT_RATIO = float(os.environ.get('PONG_REALTIME_RATIO', 0.5))
+
+# deadline misses are printed at most this often, in seconds
+REPORT_INTERVAL = 10.
+
+
+class RealTimePacer(object):
+
+    def __init__(self, ratio=None):
+        self.ratio = DEFAULT_RATIO if ratio is None else ratio
+        self.slices = 0
+        self.misses = 0
+        self.worst_lag = 0.
+        self.reset()
+
+    def reset(self):
+        # restarts the schedule, e.g. after the loop was paused
+        self.deadline = time.time()
+        self.last_report = self.deadline
+        self.reported_misses = 0
+
+    def wait(self, sim_ms):
+        """
+        Call after simulating sim_ms milliseconds. Sleeps until the slice
+        is due in wall-clock time.
+        """
+        self.slices += 1
+        self.deadline += sim_ms / 1000. / self.ratio
+        now = time.time()
+        if now < self.deadline:
+            time.sleep(self.deadline - now)
+        else:
+            lag = now - self.deadline
+            self.misses += 1
+            self.worst_lag = max(self.worst_lag, lag)
+            self.deadline = now
+
+        if now - self.last_report >= REPORT_INTERVAL:
+            self.report()
+
+    def report(self):
+        if self.misses > self.reported_misses:
+            print "realtime: %d of %d slices late, worst by %.1f ms" % (
+                self.misses, self.slices, self.worst_lag * 1000.)
+            self.reported_misses = self.misses
+        self.last_report = time.time()
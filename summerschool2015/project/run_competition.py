@@ -20,53 +20,64 @@ if rank == 2:
 if rank == 0:
     import Queue
     import threading
-    import time
     from pong import pong_vs as pong
+    from pong.state_channel import StateBroadcast
+    from mpi_channel import MPISender, MPIReceiver, STATE_TAG, ACTION_TAG
     import numpy
     import sys
 
     world_dim = {'y':4, 'x': 4}
-    global state
-    state = [{'y': 0, 'x':0}, {'y': 0, 'x':0}]
 
     class PongGame(threading.Thread):
-        state_lock = None
-        state_queue = None
+        state_broadcast = None
         action_lock0 = None
         action_queue0 = None
         action_lock1 = None
         action_queue1 = None
         
-        def __init__(self, action_lock0, action_queue0, action_lock1, action_queue1, state_lock, state_queue ):
+        def __init__(self, action_lock0, action_queue0, action_lock1, action_queue1, state_broadcast):
         	self.action_lock0 = action_lock0
         	self.action_queue0 = action_queue0
         	self.action_lock1 = action_lock1
         	self.action_queue1 = action_queue1
-        	self.state_lock = state_lock
-        	self.state_queue = state_queue
+        	self.state_broadcast = state_broadcast
         
         	threading.Thread.__init__(self)
         
         def run(self):
-        	pong.main(self.action_lock0, self.action_queue0, self.action_lock1, self.action_queue1, self.state_lock, self.state_queue)
+        	pong.main(self.action_lock0, self.action_queue0, self.action_lock1, self.action_queue1, self.state_broadcast)
+
+    def discretize(values, paddle):
+        # values are the ball and the two paddle positions in pixels
+        ball_y = min(world_dim['y']-1, int(values[0]/(480 / world_dim['y'])))
+        paddle_x = min(world_dim['x']-1, int(values[1 + paddle]/(480 / world_dim['x'])))
+        return {'y': ball_y, 'x': paddle_x}
 
     class StateCommunicator(threading.Thread):
         mpi_dest = None
+        state_broadcast = None
 
-        def __init__(self, mpi_dest):
+        def __init__(self, mpi_dest, state_broadcast):
             self.mpi_dest = mpi_dest
+            self.state_broadcast = state_broadcast
             
             threading.Thread.__init__(self)
+            self.daemon = True
 
         def run(self):
-            global state
-            old_state = state[self.mpi_dest-1]
             print "state commander running"
+            sequence = 0
+            old_state = None
+            sender = MPISender(comm, self.mpi_dest, STATE_TAG, 2)
             while True:
-                if not old_state['x'] == state[self.mpi_dest-1]['x'] or not old_state['y'] == state[self.mpi_dest-1]['y']:
-                    comm.ssend(state[self.mpi_dest-1], dest = self.mpi_dest)
-                    old_state = state[self.mpi_dest-1]
-                    time.sleep(0.01)
+                # sleeps until the game publishes a new frame
+                sequence, values = self.state_broadcast.wait(sequence)
+                state = discretize(values, self.mpi_dest - 1)
+                if state != old_state:
+                    # at most one send per controller is in flight, a state
+                    # is only sent once the previous one has been delivered
+                    sender.send([state['y'], state['x']])
+                    old_state = state
 
     class ActionCommunicator(threading.Thread):
         mpi_source = None
@@ -78,21 +89,19 @@ if rank == 0:
             self.action_queue = action_queue
             self.action_lock = action_lock
             threading.Thread.__init__(self)
+            self.daemon = True
 
         def run(self):
             print "action commander running"
+            receiver = MPIReceiver(comm, self.mpi_source, ACTION_TAG, 1)
             while True:
-                action = comm.recv(source = self.mpi_source)
+                action = int(receiver.recv()[0])
+                # the newest action replaces one the game has not taken yet
+                self.action_lock.acquire()
                 if not self.action_queue.empty():
-                	self.action_lock.acquire()
                 	self.action_queue.get()
-                	self.action_lock.release()
-                
-                if self.action_queue.empty():
-                	self.action_lock.acquire()
-                	self.action_queue.put(action)
-                	self.action_lock.release()
-                time.sleep(0.01)
+                self.action_queue.put(action)
+                self.action_lock.release()
 
     
     action_queue0 = Queue.Queue(1)
@@ -100,10 +109,9 @@ if rank == 0:
     action_queue1 = Queue.Queue(1)
     action_lock1 = threading.Lock()
     
-    state_queue = Queue.Queue(3 * 1024)
-    state_lock = threading.Lock()
+    state_broadcast = StateBroadcast()
     
-    pong_thread = PongGame(  action_lock0, action_queue0, action_lock1, action_queue1, state_lock, state_queue )
+    pong_thread = PongGame(  action_lock0, action_queue0, action_lock1, action_queue1, state_broadcast )
     pong_thread.start()
     
     print "Pong started"
@@ -115,24 +123,11 @@ if rank == 0:
     controller1_action_comm.start()
 
 
-    controller0_state_comm = StateCommunicator(1)
+    controller0_state_comm = StateCommunicator(1, state_broadcast)
     controller0_state_comm.start()
 
-    controller1_state_comm = StateCommunicator(2)
+    controller1_state_comm = StateCommunicator(2, state_broadcast)
     controller1_state_comm.start()
 
-    # poll state from pong
-    while True:
-        pass
-        if not state_queue.empty():
-            state_lock.acquire()
-            ball_y = min(world_dim['y']-1, int(state_queue.get()/(480 / world_dim['y'])))
-            paddle0 = min(world_dim['x']-1, int(state_queue.get()/(480 / world_dim['x'])))
-            paddle1 = min(world_dim['x']-1, int(state_queue.get()/(480 / world_dim['x'])))
-            state_lock.release()
-            state = [{'y': ball_y, 'x': paddle0}, {'y': ball_y, 'x': paddle1}]
-            time.sleep(0.01)
-        
-
-
-
+    # the communicators are daemon threads, the relay ends with the game
+    pong_thread.join()
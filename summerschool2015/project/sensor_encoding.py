@@ -0,0 +1,63 @@
+"""
+Position profiles and rate encoding of the continuous difference sensors.
+
+The paddle-ball difference is fed to the network by two poisson
+generators, left for negative and right for positive differences, which
+project onto a pool of diff neurons laid out over the screen. The profile
+functions give the weight of a sensor onto neurons at the positions x and
+take whole arrays, so the weights of the pool are computed in one call.
+
+    triangle_left / triangle_right    linear profile of the continuous
+                                      trainer, peak m in the middle
+    pool_left / pool_right            three part profile plotted by
+                                      difference_sensors_pool.py
+    difference_rates                  generator rates for differences
+"""
+
+import numpy as np
+
+
+def triangle_left(x, length, m=20.):
+    # rises from 0 at x = 0 to m in the middle, 0 right of the middle
+    x = np.asarray(x, dtype=float)
+    middle = length / 2
+    return np.where((x >= 0) & (x <= middle), x * (m / middle), 0.)
+
+
+def triangle_right(x, length, m=20.):
+    # falls from m in the middle to 0 at x = length, 0 left of the middle
+    x = np.asarray(x, dtype=float)
+    middle = length / 2
+    return np.where((x >= middle) & (x <= length), -x * (m / middle) + 2 * m, 0.)
+
+
+def pool_left(x, length=480, m=10.):
+    """
+    Linear up to a third of the screen, then a square root tail up to two
+    thirds, 0 beyond.
+    """
+    x = np.asarray(x, dtype=float)
+    p1 = length / 3.
+    p2 = 2 * p1
+    # np.select takes the first matching condition, like an if/elif chain
+    return np.select([(x >= 0) & (x <= p1), (x > p1) & (x <= p2)],
+                     [x * (m / p2), 0.02 * m * np.sqrt(np.maximum(p2 - x, 0.))], 0.)
+
+
+def pool_right(x, length=480, m=10.):
+    """Mirror image of pool_left."""
+    x = np.asarray(x, dtype=float)
+    p1 = length / 3.
+    p2 = 2 * p1
+    return np.select([(x >= p2) & (x <= length), (x > p1) & (x <= p2)],
+                     [-x * (m / p2) + m * 3. / 2., 0.02 * m * np.sqrt(np.maximum(x + p1, 0.))], 0.)
+
+
+def difference_rates(diff, gain):
+    """
+    Returns the (left, right) generator rates for the difference(s) diff.
+    Positive differences drive the right sensor, negative ones the left,
+    both proportional to the size of the difference.
+    """
+    diff = np.asarray(diff, dtype=float)
+    return np.where(diff < 0, -gain * diff, 0.), np.where(diff >= 0, gain * diff, 0.)
@@ -0,0 +1,44 @@
+"""
+Softmax action selection for the TD actor.
+
+The cumulated softmax probabilities of every state are cached and only
+recomputed for the state whose preferences changed. An action is drawn
+with one searchsorted on the cached row, and pick_batch draws actions for
+many states in a single call, e.g. for the games of a pong_batch.BatchGame.
+"""
+
+import numpy
+
+
+class SoftmaxSampler(object):
+
+    def __init__(self, policy):
+        # policy[y, x, action] holds the action preferences, it is not copied
+        self.policy = policy
+        self.cum_softmax_prop = numpy.empty(policy.shape)
+        self.update()
+
+    def update(self, y=None, x=None):
+        # call after policy[y, x] changed, without arguments all states are
+        # recomputed
+        if y is None:
+            index = Ellipsis
+        else:
+            index = (y, x)
+        current_policy = self.policy[index]
+        softmax_prop = numpy.exp(current_policy - current_policy.max(axis=-1)[..., numpy.newaxis])
+        cum_softmax_prop = numpy.cumsum(softmax_prop, axis=-1)
+        # normalised by the last entry, so it ends at exactly 1
+        self.cum_softmax_prop[index] = cum_softmax_prop / cum_softmax_prop[..., -1:]
+
+    def pick(self, state):
+        cum_softmax_prop = self.cum_softmax_prop[state['y'], state['x']]
+        action = numpy.searchsorted(cum_softmax_prop, numpy.random.rand(), side='right')
+        return min(int(action), len(cum_softmax_prop) - 1)
+
+    def pick_batch(self, y, x):
+        # y and x are arrays of state indices, one action is drawn per state
+        cum_softmax_prop = self.cum_softmax_prop[y, x]
+        r = numpy.random.rand(len(cum_softmax_prop), 1)
+        actions = (cum_softmax_prop <= r).sum(axis=1)
+        return numpy.minimum(actions, cum_softmax_prop.shape[1] - 1)
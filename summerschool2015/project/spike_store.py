@@ -0,0 +1,97 @@
+"""
+Bounded spike recording for long play sessions.
+
+A spike detector recording to memory keeps every event of the run, and
+GetStatus copies all of them on every call. A SpikeStore drains its
+detectors every few iterations: the new events are fetched once, the
+detectors are cleared through their n_events counter, the last window_ms
+of spikes are kept for plotting and, if a filename is given, all drained
+spikes are appended to an on-disk columnar store. Memory stays flat no
+matter how long the session runs.
+
+The store is two flat binary columns, <filename>.senders (int64) and
+<filename>.times (float64), appended to at every drain; load_spikes reads
+them back:
+
+    store = SpikeStore(sd_wta, window_ms=5000., filename="wta")
+    ...
+    store.update(iteration)
+    rplt.from_data(store.recent_data(), title="WTA circuit")
+
+Do not use a SpikeStore on detectors that a SpikeCountReadout already
+clears.
+"""
+
+import numpy as np
+import nest
+
+
+def load_spikes(filename):
+    """Returns the senders and times of an on-disk spike store."""
+    senders = np.fromfile(filename + '.senders', dtype=np.int64)
+    times = np.fromfile(filename + '.times', dtype=np.float64)
+    # a drain interrupted between the two columns leaves one of them longer
+    n = min(len(senders), len(times))
+    return {'senders': senders[:n], 'times': times[:n]}
+
+
+class SpikeStore(object):
+
+    def __init__(self, detectors, window_ms=5000., filename=None, every_iterations=100):
+        self.detectors = list(detectors)
+        self.window_ms = window_ms
+        self.every_iterations = every_iterations
+        self.last_iteration = 0
+        self.senders = np.zeros(0, np.int64)
+        self.times = np.zeros(0, np.float64)
+        self.num_spikes = 0
+        self.files = None
+        if filename is not None:
+            self.files = (open(filename + '.senders', 'ab'), open(filename + '.times', 'ab'))
+
+    def drain(self):
+        events = nest.GetStatus(self.detectors, 'events')
+        nest.SetStatus(self.detectors, {'n_events': 0})
+        senders = np.concatenate([e['senders'] for e in events]).astype(np.int64)
+        times = np.concatenate([e['times'] for e in events]).astype(np.float64)
+        self.num_spikes += len(senders)
+
+        if self.files is not None:
+            senders.tofile(self.files[0])
+            times.tofile(self.files[1])
+            self.files[0].flush()
+            self.files[1].flush()
+
+        # keep the spikes of the last window_ms for plotting
+        self.senders = np.concatenate([self.senders, senders])
+        self.times = np.concatenate([self.times, times])
+        if len(self.times):
+            keep = self.times > self.times.max() - self.window_ms
+            self.senders = self.senders[keep]
+            self.times = self.times[keep]
+
+    def update(self, iteration):
+        # call once per iteration, drains every every_iterations iterations
+        if iteration - self.last_iteration >= self.every_iterations:
+            self.last_iteration = iteration
+            self.drain()
+
+    def recent(self):
+        """
+        Spikes of the last window_ms including the ones still in the
+        detectors, as an events dict like GetStatus(detector, 'events').
+        """
+        self.drain()
+        return {'senders': self.senders, 'times': self.times}
+
+    def recent_data(self):
+        # (sender, time) rows for nest.raster_plot.from_data
+        recent = self.recent()
+        return np.column_stack([recent['senders'], recent['times']])
+
+    def close(self):
+        self.drain()
+        if self.files is not None:
+            for f in self.files:
+                f.close()
+            self.files = None
@@ -0,0 +1,73 @@
+"""
+Encoders that only send what changed to the kernel.
+
+While the ball travels the discretized state often stays the same for
+many steps, and the generator rates of the continuous network repeat as
+well. Both encoders remember what is currently set in the kernel and send
+only the difference, in one call:
+
+    StateEncoder    one-hot stimulus of the discrete networks, switches
+                    the stimulus -> state weights through a ConnectionIndex
+    RateEncoder     rates of a list of poisson generators
+"""
+
+import numpy as np
+import nest
+from connection_index import WeightBatch
+
+
+class StateEncoder(object):
+
+    def __init__(self, conn_index, weight=1.):
+        self.conn_index = conn_index
+        self.weight = weight
+        # position whose stimulus weights are switched on, None if none is
+        self.active = None
+
+    def encode(self, position, batch=None):
+        """
+        Switches the stimulus from the active position to the given one.
+        Nothing is sent if position is already active. With a WeightBatch
+        the changes are added to it instead of being sent right away.
+        """
+        if position == self.active:
+            return
+        own_batch = batch is None
+        if own_batch:
+            batch = WeightBatch()
+        if self.active is not None:
+            self.conn_index.set_stimulus(self.active, 0., batch)
+        if position is not None:
+            self.conn_index.set_stimulus(position, self.weight, batch)
+            position = dict(position)
+        self.active = position
+        if own_batch:
+            batch.flush()
+
+    def clear(self, batch=None):
+        # no state is stimulated afterwards
+        self.encode(None, batch)
+
+
+class RateEncoder(object):
+
+    def __init__(self, generators):
+        self.generators = list(generators)
+        # rates currently set, unknown until the first call
+        self.rates = None
+
+    def set_rates(self, rates):
+        """
+        rates holds one rate per generator or one rate for all of them.
+        Only the generators whose rate changed are updated, with a single
+        SetStatus call.
+        """
+        rates = np.broadcast_to(np.asarray(rates, dtype=float), (len(self.generators),))
+        if self.rates is None:
+            changed = np.ones(len(rates), bool)
+        else:
+            changed = rates != self.rates
+        if changed.any():
+            nest.SetStatus([self.generators[i] for i in np.flatnonzero(changed)],
+                           [{'rate': float(rate)} for rate in rates[changed]])
+        self.rates = rates.copy()
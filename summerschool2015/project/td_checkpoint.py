@@ -0,0 +1,64 @@
+"""
+Periodic binary snapshots of the TD policy and value tables.
+
+Rewriting the whole table as JSON after every iteration made the TD
+training I/O bound. A TableCheckpointer writes the tables with numpy.save
+only every N iterations and/or every T seconds, and once more when the
+process exits. Each table is written to a temporary file which is then
+renamed over the old one, so a reader never sees a half written snapshot
+and can memory-map the file with load_table(filename, mmap=True).
+"""
+
+import os
+import time
+import json
+import atexit
+import numpy
+
+NPY_MAGIC = b'\x93NUMPY'
+
+
+def save_table(filename, table):
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'wb') as f:
+        numpy.save(f, table)
+    os.rename(tmp_filename, filename)
+
+
+def load_table(filename, mmap=False):
+    # old snapshots are JSON lists, those are parsed instead
+    with open(filename, 'rb') as f:
+        magic = f.read(len(NPY_MAGIC))
+    if magic == NPY_MAGIC:
+        return numpy.load(filename, mmap_mode='r' if mmap else None)
+    f = open(filename, 'r')
+    table = numpy.array(json.loads(f.read()))
+    f.close()
+    return table
+
+
+class TableCheckpointer(object):
+
+    def __init__(self, tables, every_iterations=1000, every_seconds=None):
+        # tables maps file names to the arrays that are saved there; the
+        # arrays are updated in place by the training
+        self.tables = tables
+        self.every_iterations = every_iterations
+        self.every_seconds = every_seconds
+        self.last_iteration = 0
+        self.last_time = time.time()
+        atexit.register(self.save)
+
+    def save(self):
+        for filename, table in self.tables.items():
+            save_table(filename, table)
+        self.last_time = time.time()
+
+    def update(self, iteration):
+        # call once per iteration, saves when one of the intervals is over
+        if self.every_iterations and iteration - self.last_iteration >= self.every_iterations:
+            self.last_iteration = iteration
+            self.save()
+        elif self.every_seconds and time.time() - self.last_time >= self.every_seconds:
+            self.last_iteration = iteration
+            self.save()
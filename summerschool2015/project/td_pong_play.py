@@ -3,7 +3,8 @@ import numpy
 import sys
 import time
 import os
-import json
+from softmax_sampler import SoftmaxSampler
+from td_checkpoint import load_table
 import pong_environment_play_muscle as env 
 
 policy_filename = "pong_policy.dat"
@@ -18,53 +19,29 @@ world_dim = {'y': world_dim[0], 'x': world_dim[1]}
 num_possible_moves = env.getActionDim()
 state = env.getState()
 
-pol_file = None
-val_file = None
-
+# the latest training snapshot is memory-mapped, it is only read here
 if os.path.exists(policy_filename):
-	pol_file = open(policy_filename, 'r+')
-	policy = numpy.array(json.loads(pol_file.read()))
-	pol_file.close()
+	policy = load_table(policy_filename, mmap=True)
 else:
 	#create random policy
 	#print num_possible_moves 
 	policy = numpy.random.rand(world_dim['y'], world_dim['x'],  num_possible_moves)
 
-#pol_file = open(policy_filename, 'w+')
-
 if os.path.exists(values_filename):
-	val_file = open(values_filename, 'r+')
-	values = numpy.array(json.loads(val_file.read()))
-	val_file.close()
+	values = load_table(values_filename, mmap=True)
 else:
 	#create empty value funcion
 	values = numpy.zeros([world_dim['y'], world_dim['x']])
 
 
-
-#val_file = open(values_filename, 'w+')
-
-def cum_softmax_direction_prop(state):
-    # calculates the cumulated softmax propability for every possible action
-    current_policy = policy[state['y'], state['x'], :]  # prop in this agent_pos
-    softmax_prop = numpy.exp(current_policy)
-    softmax_prop = softmax_prop / numpy.sum(softmax_prop)  # softmax: (e^prop) / (sum(e^prop))
-    cum_softmax_prop = numpy.cumsum(softmax_prop)  # cumulating
-    return (cum_softmax_prop)
-
-
-def pick_action(state):
-    cum_softmax_prop = cum_softmax_direction_prop(state)
-    r = numpy.random.rand()
-    for i in range(len(cum_softmax_prop)):
-        if cum_softmax_prop[i] > r:
-            return i
+# softmax action selection on cached probabilities
+sampler = SoftmaxSampler(policy)
 
 
 while True:
     possible_actions = env.get_possible_actions()
     
-    direction = pick_action(state)
+    direction = sampler.pick(state)
     	
     last_state = state.copy()
     
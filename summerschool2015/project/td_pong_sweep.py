@@ -0,0 +1,78 @@
+"""
+Runs td_pong_train for every point of an (alpha, beta, gamma, seed) grid in
+parallel and collects the results.
+
+Every run gets its own directory SWEEP_DIR/run_<index> for its policy and
+value snapshots. When all runs are done the parameters, the final value
+tables and the learning curves are written as columns of one .npz file,
+row i of every array belongs to run i:
+
+    python td_pong_sweep.py 100000 [num_processes]
+
+    results = numpy.load("td_sweep/results.npz")
+    results['alpha'], results['values'][i], results['curves'][i]
+"""
+
+import os
+import sys
+import itertools
+import multiprocessing
+import numpy
+
+ALPHAS = [0.01, 0.05, 0.1]
+BETAS = [0.005, 0.01, 0.05]
+GAMMAS = [0.5, 0.9]
+SEEDS = [0, 1, 2]
+
+SWEEP_DIR = "td_sweep"
+RESULTS_FILENAME = os.path.join(SWEEP_DIR, "results.npz")
+
+
+def run(args):
+    index, iterations, alpha, beta, gamma, seed = args
+    # imported here so every worker process sets up its own environment
+    # state; the pool starts a fresh process for each run
+    import td_pong_train
+
+    run_dir = os.path.join(SWEEP_DIR, "run_%04d" % index)
+    if not os.path.exists(run_dir):
+        os.makedirs(run_dir)
+
+    policy, values, learning_curve = td_pong_train.train(
+        iterations, alpha, beta, gamma,
+        policy_filename=os.path.join(run_dir, "pong_policy.dat"),
+        values_filename=os.path.join(run_dir, "pong_values.dat"),
+        seed=seed, verbose=False)
+    return index, values, learning_curve
+
+
+def sweep(iterations, num_processes=None):
+    grid = list(itertools.product(ALPHAS, BETAS, GAMMAS, SEEDS))
+    tasks = [(i, iterations) + point for i, point in enumerate(grid)]
+    if not os.path.exists(SWEEP_DIR):
+        os.makedirs(SWEEP_DIR)
+
+    pool = multiprocessing.Pool(num_processes, maxtasksperchild=1)
+    results = [None] * len(tasks)
+    # runs finish in any order, results are put back by their index
+    for done, (index, values, learning_curve) in enumerate(pool.imap_unordered(run, tasks), 1):
+        results[index] = (values, learning_curve)
+        print "%d/%d runs done, run %d: alpha %g beta %g gamma %g seed %d" % (
+            (done, len(tasks), index) + tasks[index][2:])
+    pool.close()
+    pool.join()
+
+    grid = numpy.array(grid)
+    numpy.savez(RESULTS_FILENAME,
+                alpha=grid[:, 0], beta=grid[:, 1], gamma=grid[:, 2],
+                seed=grid[:, 3].astype(int),
+                values=numpy.array([values for values, _ in results]),
+                curves=numpy.array([curve for _, curve in results]))
+    return RESULTS_FILENAME
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1])
+    num_processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    results_filename = sweep(iterations, num_processes)
+    print "results written to", results_filename
@@ -0,0 +1,190 @@
+"""
+Round-robin tournament between pong controllers on headless pong_vs games.
+
+Every pair of controllers plays two matches, once on each side, because
+the ball is always served towards the right paddle. Matches are
+independent and are spread over a multiprocessing pool; started with
+mpirun every rank plays its share of the matches with its own pool and
+rank 0 collects and reports the results:
+
+    python tournament.py tracking random policy:pong_policy.dat
+    mpirun -np 4 python tournament.py tracking mymodule:make_controller
+
+A controller is given by a factory spec. Built in are "tracking" (follows
+the ball), "random", "idle" and "policy:<file>" (a td_pong_train policy
+table). Any other spec "module:function" names a function that takes a
+seed and returns a controller. A controller is called with the same
+discretized state the competition ranks receive, {'y': ball, 'x': paddle},
+and returns the direction of its paddle: 1, 0 or -1.
+"""
+
+import sys
+import json
+import itertools
+import importlib
+import multiprocessing
+import numpy
+from pong.pong_vs_headless import VsGame
+
+WORLD_DIM = {'y': 4, 'x': 4}
+NUM_FRAMES = 120 * 60
+# a controller decides every DECISION_INTERVAL frames, i.e. 10 times a
+# second at the 120 fps of pong_vs
+DECISION_INTERVAL = 12
+RESULTS_FILENAME = "tournament.json"
+
+
+def tracking_controller(seed):
+    def act(state):
+        return cmp(state['y'], state['x'])
+    return act
+
+
+def random_controller(seed):
+    rng = numpy.random.RandomState(seed)
+
+    def act(state):
+        return rng.randint(-1, 2)
+    return act
+
+
+def idle_controller(seed):
+    def act(state):
+        return 0
+    return act
+
+
+def policy_controller(seed, policy_filename):
+    from td_checkpoint import load_table
+    from softmax_sampler import SoftmaxSampler
+    numpy.random.seed(seed)
+    sampler = SoftmaxSampler(load_table(policy_filename))
+    # the order of the actions of the td environments
+    directions = [1, 0, -1]
+
+    def act(state):
+        return directions[sampler.pick(state)]
+    return act
+
+
+BUILTIN_CONTROLLERS = {'tracking': tracking_controller,
+                       'random': random_controller,
+                       'idle': idle_controller}
+
+
+def make_controller(spec, seed):
+    if spec in BUILTIN_CONTROLLERS:
+        return BUILTIN_CONTROLLERS[spec](seed)
+    module_name, _, argument = spec.partition(':')
+    if module_name == 'policy':
+        return policy_controller(seed, argument)
+    if not argument:
+        raise ValueError("unknown controller %r" % spec)
+    return getattr(importlib.import_module(module_name), argument)(seed)
+
+
+def discretize(position, height=480, dim=WORLD_DIM['y']):
+    return min(dim - 1, int(position / (height / dim)))
+
+
+def play_match(args):
+    """
+    Plays one match, right controller against left controller, and
+    returns the points of both and the rally lengths (paddle hits per
+    point).
+    """
+    right_spec, left_spec, num_frames, decision_interval, seed = args
+    right = make_controller(right_spec, seed)
+    left = make_controller(left_spec, seed + 1)
+    game = VsGame(seed=seed)
+
+    move_right = move_left = None
+    for frame in range(num_frames):
+        if frame % decision_interval == 0:
+            ball_y, paddle_y, paddle2_y = game.get_state()
+            ball_y = discretize(ball_y)
+            move_right = right({'y': ball_y, 'x': discretize(paddle_y)})
+            move_left = left({'y': ball_y, 'x': discretize(paddle2_y)})
+        else:
+            move_right = move_left = None
+        game.step(move_right, move_left)
+
+    return {'right': right_spec, 'left': left_spec, 'seed': seed,
+            'score': list(game.score), 'rallies': game.rallies}
+
+
+def schedule(specs, num_frames=NUM_FRAMES, decision_interval=DECISION_INTERVAL, seed=0):
+    # every pairing on both sides, every match with its own seed
+    pairings = [pair for a, b in itertools.combinations(specs, 2) for pair in ((a, b), (b, a))]
+    return [(right, left, num_frames, decision_interval, seed + 2 * i)
+            for i, (right, left) in enumerate(pairings)]
+
+
+def play_matches(matches, num_processes=None):
+    pool = multiprocessing.Pool(num_processes)
+    results = pool.map(play_match, matches, chunksize=1)
+    pool.close()
+    pool.join()
+    return results
+
+
+def standings(specs, results):
+    table = dict((spec, {'points': 0, 'conceded': 0, 'wins': 0, 'draws': 0,
+                         'matches': 0, 'rallies': []}) for spec in specs)
+    for result in results:
+        for side, other, spec in ((0, 1, result['right']), (1, 0, result['left'])):
+            entry = table[spec]
+            points, conceded = result['score'][side], result['score'][other]
+            entry['points'] += points
+            entry['conceded'] += conceded
+            entry['matches'] += 1
+            entry['wins'] += points > conceded
+            entry['draws'] += points == conceded
+            entry['rallies'].extend(result['rallies'])
+
+    for entry in table.values():
+        rallies = entry.pop('rallies')
+        entry['mean_rally'] = float(numpy.mean(rallies)) if rallies else 0.
+        entry['max_rally'] = max(rallies) if rallies else 0
+    return table
+
+
+def report(specs, results):
+    table = standings(specs, results)
+    ranking = sorted(specs, key=lambda spec: (table[spec]['wins'],
+                                              table[spec]['points'] - table[spec]['conceded']),
+                     reverse=True)
+    print "%-30s %5s %5s %7s %7s %10s %9s" % ("controller", "wins", "draws", "points",
+                                              "against", "mean rally", "max rally")
+    for spec in ranking:
+        entry = table[spec]
+        print "%-30s %5d %5d %7d %7d %10.2f %9d" % (spec, entry['wins'], entry['draws'],
+                                                    entry['points'], entry['conceded'],
+                                                    entry['mean_rally'], entry['max_rally'])
+
+    f = open(RESULTS_FILENAME, 'w')
+    f.write(json.dumps({'standings': table, 'matches': results}, indent=2))
+    f.close()
+
+
+def main(specs, num_processes=None):
+    matches = schedule(specs)
+    try:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+    except ImportError:
+        comm = None
+
+    if comm is None or comm.Get_size() == 1:
+        report(specs, play_matches(matches, num_processes))
+        return
+
+    # every rank plays every size-th match, rank 0 reports
+    rank, size = comm.Get_rank(), comm.Get_size()
+    results = comm.gather(play_matches(matches[rank::size], num_processes), root=0)
+    if rank == 0:
+        report(specs, [result for rank_results in results for result in rank_results])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
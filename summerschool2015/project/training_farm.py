@@ -0,0 +1,147 @@
+"""
+Runs many independent 4_pong_training.py trainings side by side.
+
+Every run is its own process with its own seed and output directory
+FARM_DIR/run_<index>. The cores of the machine are split into disjoint
+slots of THREADS_PER_RUN cores, each run is pinned to the cores of its
+slot with taskset and uses that many NEST threads. When all runs are done
+their checkpoints are merged into one connections.dat with the mean
+weight of every connection, the reward traces are collected in
+rewards.npz and a short summary is written to summary.json:
+
+    python training_farm.py NUM_RUNS [THREADS_PER_RUN] [BASE_SEED]
+"""
+
+import os
+import sys
+import json
+import threading
+import subprocess
+import multiprocessing
+import Queue
+import numpy as np
+from distutils.spawn import find_executable
+from network_checkpoint import read_checkpoint, write_checkpoint
+
+TRAINING_SCRIPT = "4_pong_training.py"
+FARM_DIR = "training_farm"
+THREADS_PER_RUN = 4
+BASE_SEED = 12345
+
+
+def core_slots(threads_per_run):
+    # disjoint sets of cores, at least one slot even on small machines
+    num_cores = multiprocessing.cpu_count()
+    threads_per_run = min(threads_per_run, num_cores)
+    return [range(first, first + threads_per_run)
+            for first in range(0, num_cores - threads_per_run + 1, threads_per_run)]
+
+
+def run_training(index, seed, cores):
+    run_dir = os.path.join(FARM_DIR, "run_%04d" % index)
+    if not os.path.exists(run_dir):
+        os.makedirs(run_dir)
+
+    environ = dict(os.environ)
+    environ.update({'PONG_SEED': str(seed),
+                    'PONG_THREADS': str(len(cores)),
+                    'PONG_OUTPUT_DIR': run_dir,
+                    'PONG_NO_PLOT': '1'})
+
+    command = [sys.executable, TRAINING_SCRIPT]
+    if find_executable("taskset"):
+        command = ["taskset", "-c", ",".join(str(core) for core in cores)] + command
+
+    log = open(os.path.join(run_dir, "training.log"), 'w')
+    returncode = subprocess.call(command, env=environ, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    return run_dir, returncode
+
+
+def slot_worker(cores, runs, finished):
+    # runs the queued trainings one after another on the cores of one slot
+    while True:
+        try:
+            index, seed = runs.get_nowait()
+        except Queue.Empty:
+            return
+        run_dir, returncode = run_training(index, seed, cores)
+        print "run", index, "seed", seed, "cores", cores, "exit code", returncode
+        finished.append((index, seed, run_dir, returncode))
+
+
+def merge_checkpoints(filenames, merged_filename):
+    """
+    Writes the mean weight of every connection over all checkpoints. All
+    runs build the same network, so the connections are matched by source
+    and target.
+    """
+    merged = None
+    weights = []
+    for filename in filenames:
+        columns, synapse_model = read_checkpoint(filename)
+        order = np.lexsort((columns['target'], columns['source']))
+        columns = dict((key, column[order]) for key, column in columns.items())
+        if merged is None:
+            merged = columns
+        elif not (np.array_equal(merged['source'], columns['source']) and
+                  np.array_equal(merged['target'], columns['target'])):
+            raise ValueError("%s does not contain the same connections" % filename)
+        weights.append(columns['weight'])
+
+    merged['weight'] = np.mean(weights, axis=0)
+    write_checkpoint(merged_filename, merged, synapse_model)
+    return np.std(weights, axis=0)
+
+
+def summarize(finished):
+    finished = sorted(run for run in finished if run[3] == 0)
+    if not finished:
+        print "no training finished successfully"
+        return
+
+    rewards = np.array([np.load(os.path.join(run_dir, "rewards.npy"))
+                        for _, _, run_dir, _ in finished])
+    np.savez(os.path.join(FARM_DIR, "rewards.npz"),
+             seed=np.array([seed for _, seed, _, _ in finished]), rewards=rewards)
+
+    weight_std = merge_checkpoints([os.path.join(run_dir, "connections.dat")
+                                    for _, _, run_dir, _ in finished],
+                                   os.path.join(FARM_DIR, "connections.dat"))
+
+    summary = {'runs': [{'index': index, 'seed': seed, 'directory': run_dir,
+                         'total_reward': float(run_rewards.sum()),
+                         'mean_reward': float(run_rewards.mean())}
+                        for (index, seed, run_dir, _), run_rewards in zip(finished, rewards)],
+               'mean_total_reward': float(rewards.sum(axis=1).mean()),
+               'std_total_reward': float(rewards.sum(axis=1).std()),
+               'mean_weight_std': float(weight_std.mean())}
+    f = open(os.path.join(FARM_DIR, "summary.json"), 'w')
+    f.write(json.dumps(summary, indent=2))
+    f.close()
+    print "mean total reward", summary['mean_total_reward'], "+-", summary['std_total_reward']
+
+
+def main(num_runs, threads_per_run=THREADS_PER_RUN, base_seed=BASE_SEED):
+    if not os.path.exists(FARM_DIR):
+        os.makedirs(FARM_DIR)
+
+    # 4_pong_training derives 2 * threads + 1 kernel seeds from its seed,
+    # the spacing keeps those of different runs apart
+    runs = Queue.Queue()
+    for index in range(num_runs):
+        runs.put((index, base_seed + index * 1000))
+
+    finished = []
+    workers = [threading.Thread(target=slot_worker, args=(cores, runs, finished))
+               for cores in core_slots(threads_per_run)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    summarize(finished)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,94 @@
+"""
+Vectorized version of the grid worlds in environment.py.
+
+A VectorEnvironment moves many independent agents through one of the
+worlds of environment_parameter at once. The outcomes are a NumPy array,
+the end positions a boolean mask and the actions row/column offsets, so a
+step of all agents is a handful of array operations. The rules are the
+ones of environment.move: a move out of the world leaves the agent where
+it is and is punished with -1, reaching an end position sets is_end_pos
+until init_new_trial is called.
+
+Example, 1000 agents taking random actions:
+
+    env = VectorEnvironment(9, 1000)
+    actions = numpy.random.randint(env.get_num_possible_actions(), size=1000)
+    (y, x), outcome, is_end_pos = env.move(actions)
+    env.init_new_trial(is_end_pos)
+"""
+
+import numpy
+import environment_parameter as params
+
+# (dy, dx) of north, east, south and west, the order of environment.actions
+MOVES = numpy.array([[-1, 0], [0, 1], [1, 0], [0, -1]])
+
+
+class VectorEnvironment(object):
+
+    def __init__(self, env, num_agents):
+        outcomes, start_pos, end_pos = params.get_environment(env)
+        self.outcomes = numpy.array(outcomes, dtype=float)
+        self.end_mask = numpy.zeros(self.outcomes.shape, bool)
+        for pos in end_pos:
+            self.end_mask[pos['y'], pos['x']] = True
+        self.start_pos = start_pos.copy()
+
+        # one dimensional worlds can only be walked west and east
+        if len(self.outcomes) == 1:
+            self.moves = MOVES[[3, 1]]
+        else:
+            self.moves = MOVES
+
+        self.num_agents = num_agents
+        self.agent_y = numpy.ones(num_agents, int) * start_pos['y']
+        self.agent_x = numpy.ones(num_agents, int) * start_pos['x']
+        self.is_end_pos = numpy.zeros(num_agents, bool)
+
+        self.states_visited = numpy.zeros(self.outcomes.shape)
+        self.states_visited[start_pos['y'], start_pos['x']] += num_agents
+        self.reward_collected = numpy.zeros(num_agents)
+        self.punishment_collected = numpy.zeros(num_agents)
+        self.num_actions = numpy.zeros(num_agents, int)
+
+    def get_world_dimensions(self):
+        return {'x': self.outcomes.shape[1], 'y': self.outcomes.shape[0]}
+
+    def get_num_possible_actions(self):
+        return len(self.moves)
+
+    def get_agent_pos(self):
+        return self.agent_y, self.agent_x
+
+    def move(self, actions):
+        """
+        Moves every agent by its action, an index into the possible moves.
+        Returns ((agent_y, agent_x), outcome, is_end_pos), one entry per
+        agent.
+        """
+        self.num_actions += 1
+        new_y = self.agent_y + self.moves[actions, 0]
+        new_x = self.agent_x + self.moves[actions, 1]
+        valid = ((new_y >= 0) & (new_y < self.outcomes.shape[0]) &
+                 (new_x >= 0) & (new_x < self.outcomes.shape[1]))
+
+        self.agent_y = numpy.where(valid, new_y, self.agent_y)
+        self.agent_x = numpy.where(valid, new_x, self.agent_x)
+        outcome = numpy.where(valid, self.outcomes[self.agent_y, self.agent_x], -1.)
+
+        numpy.add.at(self.states_visited, (self.agent_y[valid], self.agent_x[valid]), 1)
+        self.reward_collected += numpy.where(valid & (outcome > 0), outcome, 0.)
+        self.punishment_collected -= numpy.where(valid & (outcome < 0), outcome, 0.)
+        self.is_end_pos |= valid & self.end_mask[self.agent_y, self.agent_x]
+
+        return (self.agent_y, self.agent_x), outcome, self.is_end_pos.copy()
+
+    def init_new_trial(self, agents=None):
+        # puts the given agents (index or boolean mask, default all) back to
+        # the start position
+        if agents is None:
+            agents = slice(None)
+        self.agent_y[agents] = self.start_pos['y']
+        self.agent_x[agents] = self.start_pos['x']
+        self.is_end_pos[agents] = False
+        return (self.agent_y, self.agent_x), self.is_end_pos